@@ -0,0 +1,62 @@
+"""
+Conditional GET support (strong ETags / If-None-Match)
+
+ETags combine the expenses change counter with the request path and query
+string, so they can be checked with a single primary-key lookup before
+running the actual query or any ML.
+"""
+import hashlib
+from typing import Optional, Tuple
+
+from fastapi import Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from services.cache_service import get_data_version
+
+# Let browsers store responses but revalidate them on every use
+CACHE_CONTROL = "private, no-cache"
+# The ETag depends on Accept, so caches must key on it too (304s included)
+VARY = "Accept"
+
+
+def make_etag(request: Request, version: int) -> str:
+    """Builds a strong ETag for this request at the given data version"""
+    params = "&".join(f"{k}={v}" for k, v in sorted(request.query_params.multi_items()))
+    # Accept selects the representation (JSON / Arrow / MessagePack), so it is part of the tag
+    accept = request.headers.get("accept", "")
+    digest = hashlib.sha256(f"{request.url.path}?{params}|{accept}".encode()).hexdigest()[:16]
+    return f'"{version}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Evaluates an If-None-Match header (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+async def conditional_get(
+    request: Request,
+    response: Response,
+    db: AsyncSession
+) -> Tuple[int, Optional[Response]]:
+    """
+    Tags the response with an ETag and short-circuits unchanged resources.
+
+    Returns:
+        tuple: (current data version, a 304 response to return immediately
+        or None if the handler should continue)
+    """
+    version = await get_data_version(db)
+    etag = make_etag(request, version)
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = CACHE_CONTROL
+    response.headers["Vary"] = VARY
+
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return version, Response(
+            status_code=status.HTTP_304_NOT_MODIFIED,
+            headers={"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": VARY}
+        )
+    return version, None
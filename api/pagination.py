@@ -0,0 +1,29 @@
+"""
+Opaque keyset cursors for paginating expenses by (date, id)
+"""
+import base64
+import binascii
+from datetime import date
+from typing import Tuple
+
+
+def encode_cursor(last_date: date, last_id: int) -> str:
+    """Encodes the sort key of the last row on a page into an opaque token"""
+    raw = f"{last_date.isoformat()}|{last_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    """
+    Decodes a token produced by encode_cursor.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        date_part, id_part = raw.split("|", 1)
+        return date.fromisoformat(date_part), int(id_part)
+    except (binascii.Error, UnicodeDecodeError, ValueError) as e:
+        raise ValueError("Invalid pagination cursor") from e
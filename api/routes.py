@@ -1,19 +1,47 @@
-from fastapi import APIRouter, HTTPException, Query, status, Depends
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from fastapi import APIRouter, HTTPException, Query, status, Depends, Body, Request, Response, UploadFile, File
+from fastapi.responses import StreamingResponse
+from typing import Any, Dict, List, Optional
+from sqlalchemy import func, select, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import date
 
-from data.schemas import ExpenseCreate, ExpenseUpdate, ExpenseResponse
+from config import settings
+from data.schemas import (
+    ExpenseCreate, ExpenseUpdate, ExpenseResponse, ExpenseBulkResponse,
+    CategoryPredictionBatch, AnalysisJobCreate, AnalysisJobResponse
+)
 from database import get_db
 import models
+from api.pagination import encode_cursor, decode_cursor
+from api.conditional import conditional_get
+from api.serialization import (
+    EXPENSE_RESPONSE_COLUMNS, COLUMNAR_COLUMNS,
+    rows_to_dicts, orjson_response, negotiate_columnar, columnar_response
+)
+from services.ingest_service import prepare_expense_rows, insert_expense_rows
+from services.analytics_service import summarize_by_category, expense_filters
+from services.export_service import stream_expenses, EXPORT_MEDIA_TYPES
+from services.import_service import import_csv
+from services.cache_service import result_cache, cache_key, bump_data_version
+from services.rollup_service import apply_rollup_deltas, collect_deltas, expense_snapshot
+from services.job_service import job_manager, JobQueueFullError
+from services.executors import threads, processes, ExecutorSaturatedError, executor_stats
+from services import ml_service
 from ml.parser import ExpenseParser
-from ml.predictor import ExpenseML
-from ml.anomaly_detector import AnomalyDetector
-from ml.forecaster import ExpenseForecaster
-from ml.insights import InsightEngine
+from ml.predictor import ExpenseML, prediction_cache
+
+# Main router for grouped endpoints. The prefix lives on the router (not
+# include_router) so route.path is the full template used in metrics labels
+router = APIRouter(prefix=settings.API_PREFIX)
 
-# Main router for grouped endpoints
-router = APIRouter()
+
+def executor_busy(e: ExecutorSaturatedError) -> HTTPException:
+    """503 for work rejected by a saturated executor; clients should retry shortly"""
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail=str(e),
+        headers={"Retry-After": "1"}
+    )
 
 # --- Core Expense Management (CRUD) ---
 
@@ -27,7 +55,7 @@ router = APIRouter()
 )
 async def create_expense(
     expense: ExpenseCreate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Creates a new expense and automatically predicts category if missing.
@@ -43,7 +71,7 @@ async def create_expense(
         # Predict category if not provided
         category = expense.category
         if not category:
-            prediction = ExpenseML.predict_category(expense.description)
+            prediction = await threads.run(ExpenseML.predict_category, expense.description)
             category = prediction.get("category", "Other")
         
         # Create database model
@@ -57,18 +85,114 @@ async def create_expense(
         )
         
         db.add(db_expense)
-        db.commit()
-        db.refresh(db_expense)
+        await apply_rollup_deltas(db, collect_deltas([expense_snapshot(db_expense)]))
+        await bump_data_version(db)
+        await db.commit()
+        await db.refresh(db_expense)
         
         return db_expense
+    except ExecutorSaturatedError as e:
+        raise executor_busy(e)
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to create expense: {str(e)}"
         )
 
 
+@router.post(
+    "/expenses/bulk",
+    response_model=ExpenseBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    tags=["Expenses"],
+    summary="Create many expenses at once",
+    description="Insert a batch of expenses in one transaction, predicting missing categories in a single pass"
+)
+async def create_expenses_bulk(
+    expenses: List[Dict[str, Any]] = Body(..., description="List of expenses in ExpenseCreate format"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Creates many expenses in a single transaction.
+
+    Rows are validated individually; invalid rows are reported in `errors`
+    and skipped while the remaining rows are still inserted.
+
+    Args:
+        expenses: List of expense payloads
+        db: Database session
+
+    Returns:
+        ExpenseBulkResponse: Counts of created/failed rows and per-row errors
+    """
+    if len(expenses) > settings.MAX_BULK_EXPENSES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Bulk requests are limited to {settings.MAX_BULK_EXPENSES} expenses"
+        )
+
+    try:
+        # Validation and the batched category prediction run off the event loop
+        rows, errors = await threads.run(prepare_expense_rows, expenses)
+    except ExecutorSaturatedError as e:
+        raise executor_busy(e)
+
+    try:
+        # executemany: one statement, one transaction, one commit
+        await insert_expense_rows(db, rows)
+        await db.commit()
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to create expenses: {str(e)}"
+        )
+
+    return {
+        "received": len(expenses),
+        "created": len(rows),
+        "failed": len(errors),
+        "errors": errors
+    }
+
+
+@router.post(
+    "/expenses/import",
+    tags=["Expenses"],
+    summary="Import expenses from CSV",
+    description="Stream a CSV upload in chunks, normalizing, categorizing and bulk-inserting each chunk"
+)
+async def import_expenses(
+    file: UploadFile = File(..., description="CSV with description, amount, date and optional category/type/user_id"),
+    chunk_size: int = Query(settings.IMPORT_CHUNK_SIZE, ge=100, le=100000, description="Rows per chunk"),
+    user_id: Optional[int] = Query(None, description="User ID applied to rows without one"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Imports an arbitrarily large CSV file with bounded memory.
+
+    Each chunk is committed on its own, so rows from completed chunks are
+    kept even if a later chunk fails.
+
+    Returns:
+        dict: processed/created/failed counters, chunk count and the first row errors
+    """
+    try:
+        return await import_csv(db, file.file, chunk_size=chunk_size, default_user_id=user_id)
+    except ExecutorSaturatedError as e:
+        await db.rollback()
+        raise executor_busy(e)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Failed to import expenses: {str(e)}"
+        )
+    finally:
+        await file.close()
+
+
 @router.get(
     "/expenses",
     response_model=List[ExpenseResponse],
@@ -77,14 +201,18 @@ async def create_expense(
     description="Retrieve a list of all expenses with optional filtering"
 )
 async def get_expenses(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=1000, description="Maximum number of records to return"),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from X-Next-Cursor; replaces skip"),
     category: Optional[str] = Query(None, description="Filter by category"),
     type: Optional[str] = Query(None, description="Filter by type (expense/income)"),
     user_id: Optional[int] = Query(None, description="Filter by user ID"),
     start_date: Optional[date] = Query(None, description="Filter by start date"),
     end_date: Optional[date] = Query(None, description="Filter by end date"),
-    db: Session = Depends(get_db)
+    fast: bool = Query(False, description="Serialize plain rows with orjson, skipping per-row model validation"),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Returns a list of expenses with optional filtering and pagination.
@@ -92,37 +220,95 @@ async def get_expenses(
     Query Parameters:
         - skip: Number of records to skip (pagination)
         - limit: Maximum number of records to return
+        - cursor: Keyset cursor returned in the X-Next-Cursor header of the
+          previous page. Seeks directly to the next (date, id) instead of
+          scanning skipped rows, so deep pages cost the same as the first.
         - category: Filter by category name
         - type: Filter by transaction type
         - user_id: Filter by user ID
         - start_date: Filter expenses from this date
         - end_date: Filter expenses until this date
+        - fast: Select plain row tuples and encode them with orjson instead
+          of validating each ORM object into ExpenseResponse (same JSON)
+    
+    Sending `Accept: application/vnd.apache.arrow.stream` or
+    `Accept: application/msgpack` returns id/date/amount/category/type as
+    a single columnar batch instead of JSON objects.
+    
+    Responses carry a strong ETag; a matching If-None-Match returns
+    304 Not Modified without running the query.
     
     Returns:
         List[ExpenseResponse]: List of expense objects
     """
     try:
-        query = db.query(models.Expense)
+        _, not_modified = await conditional_get(request, response, db)
+        if not_modified:
+            return not_modified
+        
+        query = select(models.Expense)
         
         # Apply filters
         if category:
-            query = query.filter(models.Expense.category == category)
+            query = query.where(models.Expense.category == category)
         if type:
-            query = query.filter(models.Expense.type == type)
+            query = query.where(models.Expense.type == type)
         if user_id:
-            query = query.filter(models.Expense.user_id == user_id)
+            query = query.where(models.Expense.user_id == user_id)
         if start_date:
-            query = query.filter(models.Expense.date >= start_date)
+            query = query.where(models.Expense.date >= start_date)
         if end_date:
-            query = query.filter(models.Expense.date <= end_date)
+            query = query.where(models.Expense.date <= end_date)
         
-        # Order by date descending (most recent first)
-        query = query.order_by(models.Expense.date.desc())
+        # Order by date descending (most recent first), id breaks ties so
+        # the order is total and keyset pagination is stable
+        query = query.order_by(models.Expense.date.desc(), models.Expense.id.desc())
         
         # Apply pagination
-        expenses = query.offset(skip).limit(limit).all()
+        if cursor:
+            try:
+                last_date, last_id = decode_cursor(cursor)
+            except ValueError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail=str(e)
+                )
+            query = query.where(
+                tuple_(models.Expense.date, models.Expense.id) < (last_date, last_id)
+            )
+        else:
+            query = query.offset(skip)
+        query = query.limit(limit)
+
+        columnar_type = negotiate_columnar(request.headers.get("accept"))
+        if columnar_type:
+            rows = (await db.execute(query.with_only_columns(*COLUMNAR_COLUMNS))).all()
+            if len(rows) == limit:
+                response.headers["X-Next-Cursor"] = encode_cursor(rows[-1].date, rows[-1].id)
+            try:
+                return columnar_response(rows, columnar_type, headers=dict(response.headers))
+            except ImportError:
+                raise HTTPException(
+                    status_code=status.HTTP_406_NOT_ACCEPTABLE,
+                    detail=f"{columnar_type} responses are not available on this server"
+                )
+
+        if fast:
+            rows = rows_to_dicts((await db.execute(query.with_only_columns(*EXPENSE_RESPONSE_COLUMNS))).all())
+            if len(rows) == limit:
+                response.headers["X-Next-Cursor"] = encode_cursor(rows[-1]["date"], rows[-1]["id"])
+            return orjson_response(rows, headers=dict(response.headers))
+
+        result = await db.execute(query)
+        expenses = result.scalars().all()
+
+        if len(expenses) == limit:
+            last = expenses[-1]
+            response.headers["X-Next-Cursor"] = encode_cursor(last.date, last.id)
         
         return expenses
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -130,6 +316,45 @@ async def get_expenses(
         )
 
 
+@router.get(
+    "/expenses/export",
+    tags=["Expenses"],
+    summary="Export expenses",
+    description="Stream all matching expenses as CSV or NDJSON"
+)
+async def export_expenses(
+    format: str = Query("csv", pattern="^(csv|ndjson)$", description="Export format: csv or ndjson"),
+    category: Optional[str] = Query(None, description="Filter by category"),
+    type: Optional[str] = Query(None, description="Filter by type (expense/income)"),
+    user_id: Optional[int] = Query(None, description="Filter by user ID"),
+    start_date: Optional[date] = Query(None, description="Filter by start date"),
+    end_date: Optional[date] = Query(None, description="Filter by end date")
+):
+    """
+    Streams matching expenses without materializing them.
+
+    Rows are read through a server-side cursor and written to the client
+    chunk by chunk, so memory stays flat and the first bytes arrive
+    immediately, regardless of how many expenses match.
+
+    Returns:
+        StreamingResponse: CSV (with header) or newline-delimited JSON
+    """
+    rows = stream_expenses(
+        format,
+        category=category,
+        type=type,
+        user_id=user_id,
+        start_date=start_date,
+        end_date=end_date
+    )
+    return StreamingResponse(
+        rows,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="expenses.{format}"'}
+    )
+
+
 @router.get(
     "/expenses/{expense_id}",
     response_model=ExpenseResponse,
@@ -139,7 +364,7 @@ async def get_expenses(
 )
 async def get_expense(
     expense_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Get a specific expense by ID.
@@ -154,7 +379,7 @@ async def get_expense(
     Raises:
         404: If expense not found
     """
-    expense = db.query(models.Expense).filter(models.Expense.id == expense_id).first()
+    expense = await db.get(models.Expense, expense_id)
     
     if not expense:
         raise HTTPException(
@@ -175,7 +400,7 @@ async def get_expense(
 async def update_expense(
     expense_id: int,
     expense_update: ExpenseUpdate,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Update an existing expense.
@@ -191,7 +416,7 @@ async def update_expense(
     Raises:
         404: If expense not found
     """
-    db_expense = db.query(models.Expense).filter(models.Expense.id == expense_id).first()
+    db_expense = await db.get(models.Expense, expense_id)
     
     if not db_expense:
         raise HTTPException(
@@ -201,16 +426,22 @@ async def update_expense(
     
     try:
         # Update only provided fields
+        previous = expense_snapshot(db_expense)
         update_data = expense_update.dict(exclude_unset=True)
         for field, value in update_data.items():
             setattr(db_expense, field, value)
         
-        db.commit()
-        db.refresh(db_expense)
+        # Move the amount from the old rollup bucket to the new one
+        deltas = collect_deltas([previous], sign=-1)
+        collect_deltas([expense_snapshot(db_expense)], deltas=deltas)
+        await apply_rollup_deltas(db, deltas)
+        await bump_data_version(db)
+        await db.commit()
+        await db.refresh(db_expense)
         
         return db_expense
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Failed to update expense: {str(e)}"
@@ -226,7 +457,7 @@ async def update_expense(
 )
 async def delete_expense(
     expense_id: int,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Delete an expense.
@@ -241,7 +472,7 @@ async def delete_expense(
     Raises:
         404: If expense not found
     """
-    db_expense = db.query(models.Expense).filter(models.Expense.id == expense_id).first()
+    db_expense = await db.get(models.Expense, expense_id)
     
     if not db_expense:
         raise HTTPException(
@@ -250,10 +481,12 @@ async def delete_expense(
         )
     
     try:
-        db.delete(db_expense)
-        db.commit()
+        await db.delete(db_expense)
+        await apply_rollup_deltas(db, collect_deltas([expense_snapshot(db_expense)], sign=-1))
+        await bump_data_version(db)
+        await db.commit()
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to delete expense: {str(e)}"
@@ -262,6 +495,30 @@ async def delete_expense(
 
 # --- AI & Intelligence Suite ---
 
+def analytics_filters(
+    user_id: Optional[int] = Query(None, description="Only analyze this user's expenses"),
+    start_date: Optional[date] = Query(None, description="Analyze expenses from this date"),
+    end_date: Optional[date] = Query(None, description="Analyze expenses until this date"),
+    type: Optional[str] = Query(None, description="Filter by type (expense/income)")
+) -> Dict[str, Any]:
+    """
+    Shared user / date-window filters for the analytics endpoints.
+
+    The filters are pushed into the SQL WHERE clause (served by the
+    (user_id, date) index and the rollup primary key) and are part of
+    every result cache key.
+
+    Raises:
+        HTTPException: If start_date is after end_date
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="start_date must be on or before end_date"
+        )
+    return {"user_id": user_id, "start_date": start_date, "end_date": end_date, "type": type}
+
+
 @router.post(
     "/ai/parse",
     tags=["Intelligence"],
@@ -295,9 +552,18 @@ async def parse_expense(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Text parameter is required and cannot be empty"
             )
-        return ExpenseParser.parse_text(text)
+        # dateparser is pure Python, so it runs in a worker process; the
+        # category comes from the API process, whose model and prediction
+        # cache stay current across /ai/model/reload
+        result = await processes.run(ExpenseParser.extract_fields, text)
+        prediction = await threads.run(ExpenseML.predict_category, result["description"])
+        result["category"] = prediction.get("category", "Uncategorized")
+        result["confidence"] = prediction.get("confidence", 0.0)
+        return result
     except HTTPException:
         raise
+    except ExecutorSaturatedError as e:
+        raise executor_busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -330,7 +596,11 @@ async def predict_category(
                 detail="Text parameter is required"
             )
             
-        return ExpenseML.predict_category(text)
+        return await threads.run(ExpenseML.predict_category, text)
+    except HTTPException:
+        raise
+    except ExecutorSaturatedError as e:
+        raise executor_busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -338,31 +608,114 @@ async def predict_category(
         )
 
 
+@router.post(
+    "/ai/predict-category/batch",
+    tags=["Intelligence"],
+    summary="Predict categories for many descriptions",
+    description="Categorize a list of expense descriptions with a single model call"
+)
+async def predict_categories(batch: CategoryPredictionBatch):
+    """
+    Predicts the category of every description in one pass.
+
+    All descriptions are cleaned, vectorized and scored together, so a
+    client categorizing a whole statement pays one round-trip and one
+    model call.
+
+    Args:
+        batch: Descriptions to categorize
+
+    Returns:
+        list: Predicted category and confidence scores, in input order
+    """
+    if len(batch.descriptions) > settings.MAX_PREDICT_BATCH:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch predictions are limited to {settings.MAX_PREDICT_BATCH} descriptions"
+        )
+
+    try:
+        return await threads.run(ExpenseML.predict_categories, batch.descriptions)
+    except ExecutorSaturatedError as e:
+        raise executor_busy(e)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to predict categories: {str(e)}"
+        )
+
+
+@router.post(
+    "/ai/model/reload",
+    tags=["Intelligence"],
+    summary="Reload the categorization model",
+    description="Load retrained model artifacts from disk and clear cached predictions"
+)
+async def reload_model():
+    """
+    Swaps in the model and vectorizer currently on disk (e.g. after
+    running ml/train.py) without a restart, and drops the predictions
+    cached for the previous model. Applies to this worker process.
+
+    Returns:
+        dict: Version, load time and status of the loaded model
+    """
+    try:
+        return await threads.run(ExpenseML.reload_model)
+    except ExecutorSaturatedError as e:
+        raise executor_busy(e)
+    except FileNotFoundError as e:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to reload model: {str(e)}"
+        )
+
+
 @router.get(
     "/ai/analyze",
     tags=["Intelligence"],
     summary="Analyze spending patterns",
     description="Get a detailed breakdown of spending by category and patterns"
 )
-async def analyze_expenses(db: Session = Depends(get_db)):
+async def analyze_expenses(
+    request: Request,
+    response: Response,
+    filters: Dict[str, Any] = Depends(analytics_filters),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Provides a structural breakdown of spending by category.
+
+    Totals are read from the daily rollup table, so no expense rows are
+    loaded into Python. Results are cached until the data changes.
     
     Returns:
         dict: Analysis results including category totals and percentages
     """
     try:
-        expenses = db.query(models.Expense).all()
-        if not expenses:
+        version, not_modified = await conditional_get(request, response, db)
+        if not_modified:
+            return not_modified
+        key = cache_key("analyze", version, **filters)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        analysis = await db.run_sync(summarize_by_category, **filters)
+        if not analysis:
             return {
                 "message": "No expenses to analyze",
                 "categories": {},
                 "total": 0
             }
         
-        # Convert to dict format for ML analysis
-        expense_dicts = [exp.to_dict() for exp in expenses]
-        return ExpenseML.analyze_spending(expense_dicts)
+        result_cache.set(key, analysis)
+        return analysis
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -376,7 +729,12 @@ async def analyze_expenses(db: Session = Depends(get_db)):
     summary="Detect spending anomalies",
     description="Identify unusual or out-of-character spending using ML (Isolation Forest)"
 )
-async def get_anomalies(db: Session = Depends(get_db)):
+async def get_anomalies(
+    request: Request,
+    response: Response,
+    filters: Dict[str, Any] = Depends(analytics_filters),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Identifies unusual or out-of-character spending using ML (Isolation Forest).
     
@@ -384,15 +742,20 @@ async def get_anomalies(db: Session = Depends(get_db)):
         list: List of detected anomalies with details
     """
     try:
-        expenses = db.query(models.Expense).all()
-        if len(expenses) < 10:
-            return {
-                "message": "Need at least 10 expenses for anomaly detection",
-                "anomalies": []
-            }
+        version, not_modified = await conditional_get(request, response, db)
+        if not_modified:
+            return not_modified
+        key = cache_key("anomalies", version, **filters)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached
         
-        expense_dicts = [exp.to_dict() for exp in expenses]
-        return AnomalyDetector.detect_ml_anomalies(expense_dicts)
+        anomalies = await threads.run(ml_service.with_session, ml_service.detect_anomalies, **filters)
+        if isinstance(anomalies, list):
+            result_cache.set(key, anomalies)
+        return anomalies
+    except ExecutorSaturatedError as e:
+        raise executor_busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -407,6 +770,8 @@ async def get_anomalies(db: Session = Depends(get_db)):
     description="Project future spending trends based on historical patterns"
 )
 async def get_forecast(
+    request: Request,
+    response: Response,
     days: int = Query(
         30,
         ge=1,
@@ -414,28 +779,35 @@ async def get_forecast(
         description="Number of days to forecast (1-365)",
         example=30
     ),
-    db: Session = Depends(get_db)
+    filters: Dict[str, Any] = Depends(analytics_filters),
+    db: AsyncSession = Depends(get_db)
 ):
     """
     Projects future spending trends based on historical daily patterns.
     
     Args:
         days: Number of days to forecast (default: 30, max: 365)
+        filters: user_id / start_date / end_date / type window to forecast from
         db: Database session
         
     Returns:
         dict: Forecast data with predicted spending for each day
     """
     try:
-        expenses = db.query(models.Expense).all()
-        if len(expenses) < 10:
-            return {
-                "message": "Need at least 10 expenses for forecasting",
-                "forecast": []
-            }
+        version, not_modified = await conditional_get(request, response, db)
+        if not_modified:
+            return not_modified
+        key = cache_key("forecast", version, days=days, **filters)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached
         
-        expense_dicts = [exp.to_dict() for exp in expenses]
-        return ExpenseForecaster.forecast_spending(expense_dicts, days)
+        forecast = await threads.run(ml_service.with_session, ml_service.forecast_spending, days=days, **filters)
+        if "message" not in forecast:
+            result_cache.set(key, forecast)
+        return forecast
+    except ExecutorSaturatedError as e:
+        raise executor_busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -449,7 +821,12 @@ async def get_forecast(
     summary="Get actionable insights",
     description="Generate AI-powered financial advice and warnings"
 )
-async def get_insights(db: Session = Depends(get_db)):
+async def get_insights(
+    request: Request,
+    response: Response,
+    filters: Dict[str, Any] = Depends(analytics_filters),
+    db: AsyncSession = Depends(get_db)
+):
     """
     Generates actionable financial advice and highlights critical warnings.
     
@@ -457,15 +834,20 @@ async def get_insights(db: Session = Depends(get_db)):
         list: List of insights with priority levels and recommendations
     """
     try:
-        expenses = db.query(models.Expense).all()
-        if not expenses:
-            return {
-                "message": "No expenses to analyze for insights",
-                "insights": []
-            }
+        version, not_modified = await conditional_get(request, response, db)
+        if not_modified:
+            return not_modified
+        key = cache_key("insights", version, **filters)
+        cached = result_cache.get(key)
+        if cached is not None:
+            return cached
         
-        expense_dicts = [exp.to_dict() for exp in expenses]
-        return InsightEngine.generate_insights(expense_dicts)
+        insights = await threads.run(ml_service.with_session, ml_service.generate_insights, **filters)
+        if isinstance(insights, list):
+            result_cache.set(key, insights)
+        return insights
+    except ExecutorSaturatedError as e:
+        raise executor_busy(e)
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -473,26 +855,101 @@ async def get_insights(db: Session = Depends(get_db)):
         )
 
 
+@router.post(
+    "/ai/jobs",
+    response_model=AnalysisJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    tags=["Intelligence"],
+    summary="Submit a background analysis job",
+    description="Queue anomaly detection, forecasting or insights to run in a worker process"
+)
+async def create_analysis_job(job: AnalysisJobCreate, response: Response):
+    """
+    Queues an ML analysis and returns immediately with its job id.
+
+    The analysis runs in a bounded process pool with its own database
+    session; poll GET /ai/jobs/{job_id} for status, timings and the result.
+
+    Args:
+        job: Analysis kind plus the user / date window (and days for forecasts)
+
+    Returns:
+        AnalysisJobResponse: The queued job
+    """
+    params = job.model_dump(exclude={"kind", "days"})
+    if job.kind == "forecast":
+        params["days"] = job.days
+    try:
+        submitted = job_manager.submit(job.kind, params)
+    except JobQueueFullError as e:
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=str(e)
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to submit job: {str(e)}"
+        )
+    response.headers["Location"] = f"{settings.API_PREFIX}/ai/jobs/{submitted.id}"
+    return submitted.to_dict()
+
+
+@router.get(
+    "/ai/jobs/{job_id}",
+    response_model=AnalysisJobResponse,
+    tags=["Intelligence"],
+    summary="Get analysis job status",
+    description="Status, per-job timings and (once finished) the result of a background job"
+)
+async def get_analysis_job(job_id: str):
+    """
+    Returns the status of a background analysis job.
+
+    Args:
+        job_id: ID returned by POST /ai/jobs
+
+    Returns:
+        AnalysisJobResponse: Job status, timings and result or error
+
+    Raises:
+        HTTPException: If the job is unknown (or was dropped from history)
+    """
+    job = job_manager.get(job_id)
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Job with ID {job_id} not found"
+        )
+    return job.to_dict()
+
+
 @router.get(
     "/ai/health-check",
     tags=["Intelligence"],
     summary="Check ML models status",
     description="Verify the status of all ML models and data readiness"
 )
-async def intelligence_health(db: Session = Depends(get_db)):
+async def intelligence_health(
+    filters: Dict[str, Any] = Depends(analytics_filters),
+    db: AsyncSession = Depends(get_db)
+):
     """
-    Checks the status of all ML models and provides data readiness status.
+    Checks the status of all ML models and provides data readiness status
+    for the requested user / date window.
     
     Returns:
         dict: Health status of ML services and models
     """
     try:
-        expense_count = db.query(models.Expense).count()
+        expense_count = await db.scalar(
+            select(func.count()).select_from(models.Expense).where(*expense_filters(**filters))
+        )
         return {
             "status": "active",
             "data_points": expense_count,
             "models_loaded": {
-                "categorization": True,
+                "categorization": ExpenseML.is_ready(),
                 "anomaly_detection": "active",
                 "forecasting": expense_count >= 10,
                 "insights": "ready"
@@ -501,7 +958,12 @@ async def intelligence_health(db: Session = Depends(get_db)):
                 "sufficient_for_forecast": expense_count >= 10,
                 "sufficient_for_anomaly": expense_count >= 10,
                 "total_expenses": expense_count
-            }
+            },
+            "categorization_model": ExpenseML.model_info(),
+            "result_cache": result_cache.stats(),
+            "prediction_cache": prediction_cache.stats(),
+            "pending_jobs": job_manager.pending(),
+            "executors": executor_stats()
         }
     except Exception as e:
         raise HTTPException(
@@ -0,0 +1,110 @@
+"""
+Fast response serialization for list endpoints
+
+Selects plain row tuples and encodes them with orjson, skipping ORM
+hydration and per-row Pydantic validation. Output matches the
+ExpenseResponse JSON field for field.
+
+Bulk readers can also negotiate a columnar batch (Arrow IPC stream or
+MessagePack) via the Accept header. pyarrow and msgpack are optional;
+without them those media types are answered with 406.
+"""
+from typing import Any, Dict, List, Optional, Sequence
+
+import orjson
+from fastapi import Response
+
+import models
+
+# Same order as ExpenseResponse serializes its fields
+EXPENSE_RESPONSE_FIELDS = [
+    "description", "amount", "category", "date", "type",
+    "user_id", "id", "created_at", "updated_at"
+]
+
+EXPENSE_RESPONSE_COLUMNS = [getattr(models.Expense, f) for f in EXPENSE_RESPONSE_FIELDS]
+
+
+def rows_to_dicts(rows: Sequence[Sequence[Any]]) -> List[Dict[str, Any]]:
+    """Zips row tuples selected with EXPENSE_RESPONSE_COLUMNS into dicts"""
+    fields = EXPENSE_RESPONSE_FIELDS
+    return [dict(zip(fields, row)) for row in rows]
+
+
+def orjson_response(content: Any, headers: Dict[str, str] = None) -> Response:
+    """Encodes content with orjson (dates/datetimes as ISO 8601)"""
+    return Response(
+        content=orjson.dumps(content),
+        media_type="application/json",
+        headers=headers
+    )
+
+
+ARROW_MEDIA_TYPE = "application/vnd.apache.arrow.stream"
+MSGPACK_MEDIA_TYPES = ("application/msgpack", "application/x-msgpack")
+
+# Columns sent in columnar batches
+COLUMNAR_FIELDS = ["id", "date", "amount", "category", "type"]
+
+COLUMNAR_COLUMNS = [getattr(models.Expense, f) for f in COLUMNAR_FIELDS]
+
+
+def negotiate_columnar(accept: Optional[str]) -> Optional[str]:
+    """Returns the columnar media type requested by an Accept header, or None for JSON"""
+    if not accept:
+        return None
+    requested = [part.split(";")[0].strip().lower() for part in accept.split(",")]
+    if ARROW_MEDIA_TYPE in requested:
+        return ARROW_MEDIA_TYPE
+    for media_type in MSGPACK_MEDIA_TYPES:
+        if media_type in requested:
+            return media_type
+    return None
+
+
+def _arrow_batch(rows: Sequence[Sequence[Any]]) -> bytes:
+    import pyarrow as pa
+
+    ids, dates, amounts, categories, types = list(zip(*rows)) or [()] * len(COLUMNAR_FIELDS)
+    batch = pa.record_batch(
+        [
+            pa.array(ids, type=pa.int64()),
+            pa.array(dates, type=pa.date32()),
+            pa.array(amounts, type=pa.float64()),
+            pa.array(categories, type=pa.string()).dictionary_encode(),
+            pa.array(types, type=pa.string()).dictionary_encode(),
+        ],
+        names=COLUMNAR_FIELDS
+    )
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, batch.schema) as writer:
+        writer.write_batch(batch)
+    return sink.getvalue().to_pybytes()
+
+
+def _msgpack_batch(rows: Sequence[Sequence[Any]]) -> bytes:
+    import msgpack
+
+    columns = {field: [] for field in COLUMNAR_FIELDS}
+    for expense_id, day, amount, category, type_ in rows:
+        columns["id"].append(expense_id)
+        columns["date"].append(day.isoformat())
+        columns["amount"].append(amount)
+        columns["category"].append(category)
+        columns["type"].append(type_)
+    return msgpack.packb(columns)
+
+
+def columnar_response(
+    rows: Sequence[Sequence[Any]],
+    media_type: str,
+    headers: Dict[str, str] = None
+) -> Response:
+    """
+    Encodes rows selected with COLUMNAR_COLUMNS as one columnar batch.
+
+    Raises:
+        ImportError: If the encoder library for media_type is not installed
+    """
+    body = _arrow_batch(rows) if media_type == ARROW_MEDIA_TYPE else _msgpack_batch(rows)
+    return Response(content=body, media_type=media_type, headers=headers)
@@ -0,0 +1,344 @@
+"""
+Load generator replaying a workload trace against the API
+
+A trace is a JSONL file with one request per line:
+
+    {"name": "GET /expenses/{id}", "method": "GET", "path": "/expenses/{expense_id}"}
+    {"name": "POST /ai/parse", "method": "POST", "path": "/ai/parse", "params": {"text": "Spent 250 on lunch"}}
+
+`path` is relative to /api/v1. `params` and `json` are optional and
+`name` (defaulting to "METHOD path") groups requests in the report. The
+`{expense_id}` placeholder is filled with the id of an existing expense:
+ids are primed from GET /expenses and grow with every POST /expenses in
+the run. Create one with --generate, which mixes CRUD, /ai/parse,
+/ai/predict-category and analytics calls.
+
+The trace is replayed by --concurrency concurrent clients, either
+in-process through httpx.ASGITransport (against a scratch database seeded
+with --seed-rows expenses) or against a running server with --url. The
+replay starts once GET /ready returns 200 (waiting up to --ready-timeout
+seconds), so model loading and worker start-up are not measured. The
+report lists throughput, p50/p95/p99 latency and error rates per
+endpoint. Requests slower than --timeout seconds are cut off and counted
+as errors (e.g. ReadTimeout), so a hang shows up in the report instead of
+stalling the run.
+
+Usage:
+    python -m benchmarks.loadgen --generate 2000 --trace trace.jsonl
+    python -m benchmarks.loadgen --trace trace.jsonl [--concurrency 16] [--timeout 60] [--json]
+    python -m benchmarks.loadgen --trace trace.jsonl --url http://127.0.0.1:8000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from datetime import date
+from typing import Any, Dict, List, Optional
+
+import httpx
+import numpy as np
+
+API_PREFIX = "/api/v1"
+ID_PLACEHOLDER = "{expense_id}"
+SEED = 42
+
+PARSE_TEXTS = [
+    "Spent 250 on lunch yesterday",
+    "Paid $50 for groceries on Monday",
+    "Uber ride to work 180",
+    "Netflix subscription 499 last week",
+    "Electricity bill 1200 on 5th Jan",
+]
+
+# (weight, kind) of the synthetic workload mix
+WORKLOAD_MIX = [
+    (30, "list"),
+    (15, "get"),
+    (12, "create"),
+    (5, "update"),
+    (3, "delete"),
+    (10, "parse"),
+    (15, "predict"),
+    (4, "analyze"),
+    (2, "anomalies"),
+    (2, "forecast"),
+    (2, "insights"),
+]
+
+
+def generate_trace(n: int, seed: int = SEED, users: int = 50) -> List[Dict[str, Any]]:
+    """Builds a synthetic trace of n mixed requests"""
+    from ml.data_generator import generate_expenses
+
+    rng = random.Random(seed)
+    kinds = [kind for _, kind in WORKLOAD_MIX]
+    weights = [weight for weight, _ in WORKLOAD_MIX]
+    records = generate_expenses(n, seed=seed, start_date=date(2025, 1, 1), days=364, users=users)
+
+    trace = []
+    for record in records:
+        kind = rng.choices(kinds, weights)[0]
+        user = {"user_id": record["user_id"]}
+        if kind == "list":
+            entry = {"name": "GET /expenses", "method": "GET", "path": "/expenses", "params": {"limit": 100, **user}}
+        elif kind == "get":
+            entry = {"name": "GET /expenses/{id}", "method": "GET", "path": f"/expenses/{ID_PLACEHOLDER}"}
+        elif kind == "create":
+            entry = {"name": "POST /expenses", "method": "POST", "path": "/expenses", "json": {
+                "description": record["description"],
+                "amount": record["amount"],
+                "category": record["category"],
+                "date": record["date"].isoformat(),
+                **user,
+            }}
+        elif kind == "update":
+            entry = {"name": "PUT /expenses/{id}", "method": "PUT", "path": f"/expenses/{ID_PLACEHOLDER}",
+                     "json": {"amount": record["amount"]}}
+        elif kind == "delete":
+            entry = {"name": "DELETE /expenses/{id}", "method": "DELETE", "path": f"/expenses/{ID_PLACEHOLDER}"}
+        elif kind == "parse":
+            entry = {"name": "POST /ai/parse", "method": "POST", "path": "/ai/parse",
+                     "params": {"text": rng.choice(PARSE_TEXTS)}}
+        elif kind == "predict":
+            entry = {"name": "POST /ai/predict-category", "method": "POST", "path": "/ai/predict-category",
+                     "params": {"text": record["description"]}}
+        else:
+            entry = {"name": f"GET /ai/{kind}", "method": "GET", "path": f"/ai/{kind}", "params": user}
+        trace.append(entry)
+    return trace
+
+
+async def wait_until_ready(client: httpx.AsyncClient, timeout: float) -> None:
+    """
+    Polls GET /ready until it returns 200.
+
+    Raises:
+        RuntimeError: If warm-up failed or did not finish within timeout seconds
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        try:
+            response = await client.get("/ready")
+        except httpx.TransportError as e:
+            # A server that is still starting may refuse connections
+            detail = f"{type(e).__name__}: {e}"
+        else:
+            if response.status_code == 200:
+                return
+            if response.json().get("status") == "failed":
+                raise RuntimeError(f"App warm-up failed: {response.text}")
+            detail = response.text
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"App not ready after {timeout:.0f}s: {detail}")
+        await asyncio.sleep(0.1)
+
+
+def load_trace(path: str) -> List[Dict[str, Any]]:
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class LoadRun:
+    """Replays a trace with a fixed number of concurrent clients and records latencies"""
+
+    def __init__(self, client: httpx.AsyncClient, trace: List[Dict[str, Any]], concurrency: int, seed: int = SEED):
+        self.client = client
+        self.trace = trace
+        self.concurrency = concurrency
+        self.rng = random.Random(seed)
+        self.expense_ids: List[int] = []
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self.elapsed = 0.0
+
+    async def prime_ids(self) -> None:
+        response = await self.client.get(f"{API_PREFIX}/expenses", params={"limit": 1000, "fast": True})
+        response.raise_for_status()
+        self.expense_ids = [expense["id"] for expense in response.json()]
+
+    def _resolve_path(self, path: str) -> Optional[str]:
+        if ID_PLACEHOLDER not in path:
+            return path
+        if not self.expense_ids:
+            return None
+        return path.replace(ID_PLACEHOLDER, str(self.rng.choice(self.expense_ids)))
+
+    async def _send(self, entry: Dict[str, Any]) -> None:
+        name = entry.get("name") or f"{entry['method']} {entry['path']}"
+        path = self._resolve_path(entry["path"])
+        if path is None:
+            self.errors[name]["no_expense_id"] += 1
+            return
+
+        start = time.perf_counter()
+        try:
+            response = await self.client.request(
+                entry["method"], API_PREFIX + path,
+                params=entry.get("params"), json=entry.get("json")
+            )
+        except httpx.HTTPError as e:
+            self.latencies[name].append(time.perf_counter() - start)
+            self.errors[name][type(e).__name__] += 1
+            return
+        self.latencies[name].append(time.perf_counter() - start)
+
+        if response.status_code >= 400:
+            self.errors[name][str(response.status_code)] += 1
+        elif entry["method"] == "POST" and entry["path"] == "/expenses":
+            self.expense_ids.append(response.json()["id"])
+        elif entry["method"] == "DELETE":
+            expense_id = int(path.rsplit("/", 1)[1])
+            if expense_id in self.expense_ids:
+                self.expense_ids.remove(expense_id)
+
+    async def _worker(self, queue: asyncio.Queue) -> None:
+        while True:
+            try:
+                entry = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            await self._send(entry)
+
+    async def run(self) -> None:
+        queue: asyncio.Queue = asyncio.Queue()
+        for entry in self.trace:
+            queue.put_nowait(entry)
+        start = time.perf_counter()
+        await asyncio.gather(*(self._worker(queue) for _ in range(self.concurrency)))
+        self.elapsed = time.perf_counter() - start
+
+    def report(self) -> Dict[str, Any]:
+        endpoints = []
+        for name in sorted(set(self.latencies) | set(self.errors)):
+            samples = self.latencies.get(name, [])
+            errors = dict(self.errors.get(name, {}))
+            total = len(samples) + errors.get("no_expense_id", 0)
+            p50, p95, p99 = np.percentile(samples, [50, 95, 99]) if samples else (0.0, 0.0, 0.0)
+            endpoints.append({
+                "endpoint": name,
+                "requests": total,
+                "throughput_per_s": round(len(samples) / self.elapsed, 2) if self.elapsed else None,
+                "p50_ms": round(p50 * 1000, 3),
+                "p95_ms": round(p95 * 1000, 3),
+                "p99_ms": round(p99 * 1000, 3),
+                "error_rate": round(sum(errors.values()) / total, 4) if total else 0.0,
+                "errors": errors,
+            })
+        completed = sum(len(samples) for samples in self.latencies.values())
+        return {
+            "concurrency": self.concurrency,
+            "requests": len(self.trace),
+            "elapsed_s": round(self.elapsed, 3),
+            "throughput_per_s": round(completed / self.elapsed, 2) if self.elapsed else None,
+            "endpoints": endpoints,
+        }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(
+        f"{report['requests']} requests, concurrency {report['concurrency']}: "
+        f"{report['elapsed_s']}s, {report['throughput_per_s']} req/s\n"
+    )
+    print(f"{'endpoint':<28} {'count':>6} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for e in report["endpoints"]:
+        print(
+            f"{e['endpoint']:<28} {e['requests']:>6} {e['throughput_per_s']:>8} {e['p50_ms']:>9} "
+            f"{e['p95_ms']:>9} {e['p99_ms']:>9} {e['error_rate']:>7.1%}"
+        )
+        if e["errors"]:
+            print(f"{'':<28} {e['errors']}")
+
+
+async def run_in_process(
+    trace: List[Dict[str, Any]], concurrency: int, seed_rows: int, timeout: float, ready_timeout: float
+) -> Dict[str, Any]:
+    from sqlalchemy import insert
+
+    import models
+    from database import SessionLocal
+    from main import app
+    from ml.data_generator import generate_expenses
+    from services.rollup_service import rebuild_rollups
+
+    async with app.router.lifespan_context(app):
+        with SessionLocal() as db:
+            rows = generate_expenses(seed_rows, seed=SEED, start_date=date(2025, 1, 1), days=364, users=50)
+            db.execute(insert(models.Expense), list(rows))
+            rebuild_rollups(db)
+            db.commit()
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://loadgen", timeout=timeout) as client:
+            await wait_until_ready(client, ready_timeout)
+            run = LoadRun(client, trace, concurrency)
+            await run.prime_ids()
+            await run.run()
+            return run.report()
+
+
+async def run_against_url(
+    trace: List[Dict[str, Any]], concurrency: int, url: str, timeout: float, ready_timeout: float
+) -> Dict[str, Any]:
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=timeout) as client:
+        await wait_until_ready(client, ready_timeout)
+        run = LoadRun(client, trace, concurrency)
+        await run.prime_ids()
+        await run.run()
+        return run.report()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--trace", required=True, help="Trace JSONL to replay (or write with --generate)")
+    parser.add_argument("--generate", type=int, metavar="N", help="Write a synthetic trace of N requests and exit")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--url", help="Base URL of a running server; default runs the app in-process")
+    parser.add_argument("--seed-rows", type=int, default=5000, help="Expenses seeded for in-process runs")
+    parser.add_argument("--timeout", type=float, default=60, help="Per-request timeout in seconds")
+    parser.add_argument("--ready-timeout", type=float, default=120, help="Seconds to wait for GET /ready")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    if args.generate:
+        with open(args.trace, "w") as f:
+            for entry in generate_trace(args.generate):
+                f.write(json.dumps(entry) + "\n")
+        print(f"Wrote {args.generate} requests to {args.trace}", file=sys.stderr)
+        return
+
+    trace = load_trace(args.trace)
+    if args.url:
+        try:
+            report = asyncio.run(run_against_url(trace, args.concurrency, args.url, args.timeout, args.ready_timeout))
+        except httpx.HTTPError as e:
+            sys.exit(f"Could not load expenses from {args.url}: {e}")
+        except RuntimeError as e:
+            sys.exit(str(e))
+    else:
+        with tempfile.TemporaryDirectory() as tmp:
+            # The app binds its engines at import, so point them at the scratch
+            # database before anything imports `database`
+            os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'loadgen.db')}"
+            logging.getLogger("httpx").setLevel(logging.WARNING)
+            try:
+                report = asyncio.run(run_in_process(
+                    trace, args.concurrency, args.seed_rows, args.timeout, args.ready_timeout
+                ))
+            except RuntimeError as e:
+                sys.exit(str(e))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Per-row serialization cost of GET /expenses at limit=1000
+
+Compares the default response_model path (ORM objects validated into
+ExpenseResponse, then jsonable_encoder + stdlib json) against the
+?fast=true path (row tuples zipped into dicts and encoded with orjson).
+
+Usage:
+    python -m benchmarks.serialization [--rows 1000] [--repeat 50]
+"""
+import argparse
+import json
+import statistics
+import time
+from datetime import date, datetime, timedelta
+from typing import List
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+import models
+from api.serialization import EXPENSE_RESPONSE_FIELDS, orjson_response, rows_to_dicts
+from data.schemas import ExpenseResponse
+
+
+def _make_rows(n: int) -> List[tuple]:
+    created = datetime(2026, 1, 1, 12, 0, 0)
+    return [
+        ("Lunch at MCD", 12.5 + i % 50, "Food", date(2026, 1, 1) + timedelta(days=i % 365),
+         "expense", i % 7 or None, i + 1, created, None)
+        for i in range(n)
+    ]
+
+
+def _timeit(fn, repeat: int) -> List[float]:
+    fn()  # warm-up
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    rows = _make_rows(args.rows)
+    orm_objects = [models.Expense(**dict(zip(EXPENSE_RESPONSE_FIELDS, row))) for row in rows]
+    adapter = TypeAdapter(List[ExpenseResponse])
+
+    def default_path():
+        validated = adapter.validate_python(orm_objects, from_attributes=True)
+        return json.dumps(jsonable_encoder(validated)).encode()
+
+    def fast_path():
+        return orjson_response(rows_to_dicts(rows)).body
+
+    assert json.loads(default_path()) == json.loads(fast_path()), "serializers disagree"
+
+    results = []
+    for name, fn in (("response_model", default_path), ("fast (orjson)", fast_path)):
+        samples = _timeit(fn, args.repeat)
+        median = statistics.median(samples)
+        results.append({
+            "path": name,
+            "rows": args.rows,
+            "median_ms": round(median * 1000, 3),
+            "per_row_us": round(median / args.rows * 1e6, 3),
+        })
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'path':<16} {'median ms':>10} {'us/row':>8}")
+    for r in results:
+        print(f"{r['path']:<16} {r['median_ms']:>10} {r['per_row_us']:>8}")
+    speedup = results[0]["median_ms"] / results[1]["median_ms"]
+    print(f"\nfast path is {speedup:.1f}x faster per row")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Mixed read/write throughput of the SQLite storage profiles
+
+Runs concurrent writer threads (single-row insert + commit, like
+POST /expenses) and reader threads (filtered date-range queries, like
+GET /expenses) against a scratch database for each profile and prints
+operations per second.
+
+Usage:
+    python -m benchmarks.sqlite_profile [--seconds 5] [--readers 4] [--writers 2]
+"""
+import argparse
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import insert, select
+from sqlalchemy.orm import sessionmaker
+
+import models
+from database import build_engine
+
+SEED_ROWS = 20000
+CATEGORIES = ["Food", "Transport", "Utilities", "Shopping", "Health", "Entertainment"]
+
+
+def _random_row(rng: random.Random) -> dict:
+    return {
+        "description": "Benchmark expense",
+        "amount": round(rng.uniform(5, 500), 2),
+        "category": rng.choice(CATEGORIES),
+        "date": date(2025, 1, 1) + timedelta(days=rng.randint(0, 364)),
+        "type": "expense",
+        "user_id": rng.randint(1, 50),
+    }
+
+
+def run_profile(profile: str, seconds: float, readers: int, writers: int) -> dict:
+    """Seeds a scratch database and measures reads/writes per second under contention"""
+    with tempfile.TemporaryDirectory() as tmp:
+        engine = build_engine(f"sqlite:///{os.path.join(tmp, 'bench.db')}", profile=profile)
+        models.Base.metadata.create_all(bind=engine)
+        Session = sessionmaker(bind=engine)
+
+        rng = random.Random(42)
+        with Session() as db:
+            db.execute(insert(models.Expense), [_random_row(rng) for _ in range(SEED_ROWS)])
+            db.commit()
+
+        counts = {"reads": 0, "writes": 0, "errors": 0}
+        lock = threading.Lock()
+        stop = threading.Event()
+
+        def writer(seed: int):
+            local_rng = random.Random(seed)
+            while not stop.is_set():
+                try:
+                    with Session() as db:
+                        db.add(models.Expense(**_random_row(local_rng)))
+                        db.commit()
+                    key = "writes"
+                except Exception:
+                    key = "errors"
+                with lock:
+                    counts[key] += 1
+
+        def reader(seed: int):
+            local_rng = random.Random(seed)
+            while not stop.is_set():
+                start = date(2025, 1, 1) + timedelta(days=local_rng.randint(0, 330))
+                stmt = (
+                    select(models.Expense)
+                    .where(models.Expense.date.between(start, start + timedelta(days=30)))
+                    .order_by(models.Expense.date.desc())
+                    .limit(100)
+                )
+                try:
+                    with Session() as db:
+                        db.execute(stmt).scalars().all()
+                    key = "reads"
+                except Exception:
+                    key = "errors"
+                with lock:
+                    counts[key] += 1
+
+        threads = [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+        threads += [threading.Thread(target=reader, args=(100 + i,)) for i in range(readers)]
+        for t in threads:
+            t.start()
+        time.sleep(seconds)
+        stop.set()
+        for t in threads:
+            t.join()
+        engine.dispose()
+
+    return {
+        "profile": profile,
+        "reads_per_sec": round(counts["reads"] / seconds, 1),
+        "writes_per_sec": round(counts["writes"] / seconds, 1),
+        "errors": counts["errors"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=5.0)
+    parser.add_argument("--readers", type=int, default=4)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = [run_profile(p, args.seconds, args.readers, args.writers) for p in ("default", "tuned")]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'profile':<10} {'reads/s':>10} {'writes/s':>10} {'errors':>8}")
+    for r in results:
+        print(f"{r['profile']:<10} {r['reads_per_sec']:>10} {r['writes_per_sec']:>10} {r['errors']:>8}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Reproducible benchmark suite for the API and ML hot paths
+
+For each dataset size a scratch SQLite database is seeded with synthetic
+expenses from ml.data_generator (fixed seed), then every benchmark is
+timed and summarized as p50 / p99 / mean latency and throughput:
+
+- CRUD routes through the ASGI app: create, get, list (limit=100),
+  update, delete
+- ExpenseParser.parse_text and ExpenseML.predict_category on generated
+  descriptions
+- AnomalyDetector.detect_ml_anomalies, ExpenseForecaster.forecast_spending
+  and InsightEngine.generate_insights on the whole dataset frame
+
+Timing starts only once GET /ready returns 200 (model loaded, parser
+workers started), so background warm-up never overlaps a benchmark.
+Results are written as JSON so runs from different commits can be
+compared with --compare.
+
+Usage:
+    python -m benchmarks.suite [--sizes 1k,100k,1m] [--output results.json]
+    python -m benchmarks.suite --sizes 1k --compare baseline.json
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import date, datetime, timezone
+from itertools import islice
+from typing import Callable, Dict, List
+
+import numpy as np
+
+SEED = 42
+USERS = 50
+SEED_CHUNK = 50000
+PARSE_TEXTS = [
+    "Spent 250 on lunch yesterday",
+    "Paid $50 for groceries on Monday",
+    "Uber ride to work 180",
+    "Netflix subscription 499 last week",
+    "Electricity bill 1200 on 5th Jan",
+]
+
+
+def parse_size(label: str) -> int:
+    """Parses 1k / 100k / 1m style dataset sizes"""
+    label = label.strip().lower()
+    multiplier = {"k": 1000, "m": 1000000}.get(label[-1], 1)
+    return int(float(label.rstrip("km")) * multiplier)
+
+
+def summarize(name: str, size: int, samples: List[float], items_per_call: int = 1) -> Dict:
+    """p50 / p99 / mean latency in ms and throughput in items per second"""
+    p50, p99 = np.percentile(samples, [50, 99])
+    total = sum(samples)
+    return {
+        "benchmark": name,
+        "size": size,
+        "repeat": len(samples),
+        "p50_ms": round(p50 * 1000, 3),
+        "p99_ms": round(p99 * 1000, 3),
+        "mean_ms": round(total / len(samples) * 1000, 3),
+        "throughput_per_s": round(len(samples) * items_per_call / total, 2) if total else None,
+    }
+
+
+def time_calls(fn: Callable[[int], object], repeat: int, warmup: int = 1) -> List[float]:
+    """Times fn(i) for i in range(repeat) after warm-up calls"""
+    for i in range(warmup):
+        fn(i)
+    samples = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        fn(i)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def wait_until_ready(client, timeout: float) -> None:
+    """
+    Polls GET /ready until it returns 200.
+
+    Raises:
+        RuntimeError: If warm-up failed or did not finish within timeout seconds
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        response = client.get("/ready")
+        if response.status_code == 200:
+            return
+        if response.json().get("status") == "failed":
+            raise RuntimeError(f"App warm-up failed: {response.text}")
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"App not ready after {timeout:.0f}s: {response.text}")
+        time.sleep(0.1)
+
+
+def seed_database(size: int) -> None:
+    """Recreates the schema and loads `size` generated expenses plus rollups"""
+    from sqlalchemy import insert
+
+    import models
+    from database import SessionLocal, engine
+    from ml.data_generator import generate_expenses
+    from services.rollup_service import rebuild_rollups
+
+    models.Base.metadata.drop_all(bind=engine)
+    models.Base.metadata.create_all(bind=engine)
+
+    # A year of data so forecasts and rollups see a realistic span
+    records = generate_expenses(size, seed=SEED, start_date=date(2025, 1, 1), days=364, users=USERS)
+    with SessionLocal() as db:
+        while True:
+            chunk = list(islice(records, SEED_CHUNK))
+            if not chunk:
+                break
+            db.execute(insert(models.Expense), chunk)
+        rebuild_rollups(db)
+        db.commit()
+
+
+def bench_crud(client, size: int, repeat: int) -> List[Dict]:
+    payload = {"description": "Benchmark lunch", "amount": 12.5, "category": "Food", "date": "2025-06-01", "user_id": 1}
+    created: List[int] = []
+
+    def create(i):
+        response = client.post("/api/v1/expenses", json=payload)
+        created.append(response.json()["id"])
+
+    results = [summarize("crud_create", size, time_calls(create, repeat))]
+    ids = created[-repeat:]
+    results.append(summarize("crud_get", size, time_calls(lambda i: client.get(f"/api/v1/expenses/{ids[i]}"), repeat)))
+    results.append(summarize(
+        "crud_list_100", size,
+        time_calls(lambda i: client.get("/api/v1/expenses", params={"limit": 100, "user_id": i % USERS + 1}), repeat),
+        items_per_call=100
+    ))
+    results.append(summarize(
+        "crud_update", size,
+        time_calls(lambda i: client.put(f"/api/v1/expenses/{ids[i]}", json={"amount": 20 + i}), repeat)
+    ))
+    # Warm-up deletes the extra row created during create's warm-up
+    doomed = [created[0]] + ids
+    results.append(summarize(
+        "crud_delete", size,
+        time_calls(lambda i: client.delete(f"/api/v1/expenses/{doomed[i]}"), repeat, warmup=0)
+    ))
+    return results
+
+
+def bench_ml(size: int, repeat_small: int, repeat_large: int) -> List[Dict]:
+    from database import SessionLocal
+    from ml.anomaly_detector import AnomalyDetector
+    from ml.data_generator import generate_expenses
+    from ml.forecaster import ExpenseForecaster
+    from ml.insights import InsightEngine
+    from ml.parser import ExpenseParser
+    from ml.predictor import ExpenseML
+    from services.analytics_service import load_expense_frame
+
+    descriptions = [r["description"] for r in generate_expenses(repeat_small + 1, seed=SEED + 1)]
+    results = [
+        summarize("parse_text", size, time_calls(lambda i: ExpenseParser.parse_text(PARSE_TEXTS[i % len(PARSE_TEXTS)]), repeat_small)),
+        summarize("predict_category", size, time_calls(lambda i: ExpenseML.predict_category(descriptions[i]), repeat_small)),
+    ]
+
+    with SessionLocal() as db:
+        load_samples = time_calls(lambda i: load_expense_frame(db), repeat_large, warmup=0)
+        frame = load_expense_frame(db)
+    results.append(summarize("load_expense_frame", size, load_samples, items_per_call=size))
+    results.append(summarize(
+        "detect_ml_anomalies", size,
+        time_calls(lambda i: AnomalyDetector.detect_ml_anomalies(frame), repeat_large, warmup=0),
+        items_per_call=size
+    ))
+    results.append(summarize(
+        "forecast_spending", size,
+        time_calls(lambda i: ExpenseForecaster.forecast_spending(frame), repeat_large, warmup=0),
+        items_per_call=size
+    ))
+    results.append(summarize(
+        "generate_insights", size,
+        time_calls(lambda i: InsightEngine.generate_insights(frame), repeat_large, warmup=0),
+        items_per_call=size
+    ))
+    return results
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def compare(results: List[Dict], baseline_path: str, threshold: float) -> bool:
+    """Prints p50 ratios against a baseline run; returns False on any regression"""
+    with open(baseline_path) as f:
+        baseline = {(r["benchmark"], r["size"]): r for r in json.load(f)["results"]}
+
+    ok = True
+    print(f"\n{'benchmark':<22} {'size':>8} {'base p50':>10} {'p50':>10} {'ratio':>7}")
+    for r in results:
+        base = baseline.get((r["benchmark"], r["size"]))
+        if not base or not base["p50_ms"]:
+            continue
+        ratio = r["p50_ms"] / base["p50_ms"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        ok = ok and not flag
+        print(f"{r['benchmark']:<22} {r['size']:>8} {base['p50_ms']:>10} {r['p50_ms']:>10} {ratio:>7.2f}{flag}")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1k,100k,1m", help="Comma-separated dataset sizes")
+    parser.add_argument("--repeat-small", type=int, default=200, help="Calls per CRUD / parse / predict benchmark")
+    parser.add_argument("--repeat-large", type=int, default=5, help="Calls per whole-dataset ML benchmark")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="Baseline results JSON to compare p50 latencies against")
+    parser.add_argument("--threshold", type=float, default=1.2, help="p50 ratio counted as a regression")
+    parser.add_argument("--ready-timeout", type=float, default=120, help="Seconds to wait for GET /ready")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # The app binds its engines at import, so point them at the scratch
+        # database before anything imports `database`
+        os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(tmp, 'bench.db')}"
+        os.environ.setdefault("MEMORY_TRACKING_SAMPLE_RATE", "0")
+        from fastapi.testclient import TestClient
+        from main import app
+
+        # One INFO line per request would drown the results
+        logging.getLogger("httpx").setLevel(logging.WARNING)
+
+        results = []
+        with TestClient(app) as client:
+            for label in args.sizes.split(","):
+                size = parse_size(label)
+                start = time.perf_counter()
+                seed_database(size)
+                print(f"Seeded {size} expenses in {time.perf_counter() - start:.1f}s", file=sys.stderr)
+                try:
+                    wait_until_ready(client, args.ready_timeout)
+                except RuntimeError as e:
+                    sys.exit(str(e))
+
+                for result in bench_crud(client, size, args.repeat_small) + bench_ml(size, args.repeat_small, args.repeat_large):
+                    results.append(result)
+                    print(
+                        f"{result['benchmark']:<22} {size:>8}  p50 {result['p50_ms']:>10} ms"
+                        f"  p99 {result['p99_ms']:>10} ms  {result['throughput_per_s']:>12}/s",
+                        file=sys.stderr
+                    )
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "seed": SEED,
+            "repeat_small": args.repeat_small,
+            "repeat_large": args.repeat_large,
+        },
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {len(results)} results to {args.output}", file=sys.stderr)
+
+    if args.compare and not compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
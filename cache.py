@@ -0,0 +1,92 @@
+"""
+In-process LRU cache with hit/miss counters
+
+Dependency-free (like metrics.py) so any layer can use it, including the
+ml modules loaded by worker processes and offline training, without
+importing the database. Caches registered with register_cache_metrics()
+are exported on /metrics.
+"""
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+from metrics import registry
+
+_MISSING = object()
+
+
+class ResultCache:
+    """Thread-safe LRU cache with per-entry TTL (None: no expiry) and hit/miss counters"""
+
+    def __init__(self, maxsize: int, ttl_seconds: Optional[float]):
+        self.maxsize = maxsize
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Optional[float], Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING:
+                expires_at, value = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            expires_at = None if self.ttl_seconds is None else time.monotonic() + self.ttl_seconds
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "maxsize": self.maxsize,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            }
+
+
+# Caches exported on /metrics, by their `cache` label
+_metered_caches: Dict[str, ResultCache] = {}
+
+
+def register_cache_metrics(name: str, cache: ResultCache) -> None:
+    """Exports a cache's hit/miss counters on /metrics with cache=<name>"""
+    _metered_caches[name] = cache
+
+
+def _collect_cache_metrics():
+    stats = {name: cache.stats() for name, cache in _metered_caches.items()}
+    for field, metric, metric_type, documentation in (
+        ("hits", "cache_hits_total", "counter", "Cache lookups served from the cache"),
+        ("misses", "cache_misses_total", "counter", "Cache lookups that missed"),
+        ("evictions", "cache_evictions_total", "counter", "Entries evicted to stay within maxsize"),
+        ("hit_ratio", "cache_hit_ratio", "gauge", "Hits divided by lookups since startup"),
+        ("size", "cache_entries", "gauge", "Entries currently cached"),
+    ):
+        yield metric, metric_type, documentation, [({"cache": name}, s[field]) for name, s in stats.items()]
+
+
+registry.register_collector(_collect_cache_metrics)
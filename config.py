@@ -28,9 +28,51 @@ class Settings(BaseSettings):
     MIN_EXPENSES_FOR_FORECAST: int = 10
     DEFAULT_FORECAST_DAYS: int = 30
     ANOMALY_CONTAMINATION: float = 0.1
+    MAX_PREDICT_BATCH: int = 1000  # descriptions per /ai/predict-category/batch request
+    PREDICTION_CACHE_SIZE: int = 10000  # memoized predictions per process
+    
+    # Result Cache Settings (/ai endpoints)
+    RESULT_CACHE_SIZE: int = 256
+    RESULT_CACHE_TTL_SECONDS: int = 300
+
+    # Executors for CPU-bound work (thread pool: sklearn/NumPy, process pool: pure Python)
+    EXECUTOR_THREAD_WORKERS: int = 4
+    EXECUTOR_THREAD_MAX_PENDING: int = 64
+    EXECUTOR_PROCESS_WORKERS: int = 2
+    EXECUTOR_PROCESS_MAX_PENDING: int = 64
+    EXECUTOR_TASK_TIMEOUT_SECONDS: float = 60.0  # awaited tasks; background jobs are not bounded
+
+    # Background ML Jobs (/ai/jobs, own process pool)
+    AI_JOB_WORKERS: int = 2
+    AI_JOB_MAX_QUEUED: int = 32
+    AI_JOB_HISTORY_SIZE: int = 500
+    
+    # Request Profiling (off by default; nothing is registered unless enabled)
+    PROFILING_ENABLED: bool = False
+    PROFILE_TOKEN: str = ""  # profiles requests sending it as X-Profile-Token; required to read /debug/profiles
+    PROFILE_SAMPLE_RATE: float = 0.0  # fraction of all requests to profile
+    PROFILE_INTERVAL_MS: float = 5.0
+    PROFILE_MAX_STORED: int = 50
     
     # Data Settings
-    MAX_EXPENSES_IN_MEMORY: int = 10000
+    MAX_EXPENSES_IN_MEMORY: int = 10000  # above this, analyses sample / chunk raw rows
+    MEMORY_TRACKING_SAMPLE_RATE: float = 0.05  # fraction of ML sections traced with tracemalloc
+    MAX_BULK_EXPENSES: int = 50000
+    EXPORT_CHUNK_SIZE: int = 1000
+    IMPORT_CHUNK_SIZE: int = 5000
+    
+    # Storage Settings
+    # "tuned" applies the SQLite pragmas below on every new connection;
+    # "default" leaves SQLite's stock settings (rollback journal, synchronous=FULL)
+    DB_STORAGE_PROFILE: str = "tuned"
+    SQLITE_JOURNAL_MODE: str = "WAL"
+    SQLITE_SYNCHRONOUS: str = "NORMAL"
+    SQLITE_CACHE_SIZE: int = -64000  # negative = KiB, so ~64 MB per connection
+    SQLITE_MMAP_SIZE: int = 268435456  # 256 MB
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000
+    DB_POOL_SIZE: int = 10
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: int = 30
     
     # Logging
     LOG_LEVEL: str = "info"
@@ -0,0 +1,39 @@
+"""
+Columnar expense frames shared by the ML modules
+
+pandas is imported on first use so that importing the API stays cheap.
+"""
+from typing import TYPE_CHECKING, Any, Iterable, Union
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Columns the ML modules read; loaders select only these
+EXPENSE_FRAME_COLUMNS = ["id", "date", "amount", "category", "description", "type"]
+
+
+def normalize_expense_frame(df: "pd.DataFrame") -> "pd.DataFrame":
+    """Ensures typed dates and a categorical category column"""
+    import pandas as pd
+
+    if "date" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["date"]):
+        df["date"] = pd.to_datetime(df["date"])
+    if "category" in df.columns and not isinstance(df["category"].dtype, pd.CategoricalDtype):
+        df["category"] = df["category"].astype("category")
+    return df
+
+
+def as_expense_frame(expenses: Union["pd.DataFrame", Iterable[Any]]) -> "pd.DataFrame":
+    """
+    Returns expenses as a DataFrame.
+
+    Accepts a frame produced by the database loader (returned as-is), or a
+    list of Expense schemas / plain dicts for ad-hoc callers.
+    """
+    import pandas as pd
+
+    if isinstance(expenses, pd.DataFrame):
+        return normalize_expense_frame(expenses)
+
+    records = [e.model_dump() if hasattr(e, "model_dump") else dict(e) for e in expenses]
+    return normalize_expense_frame(pd.DataFrame(records))
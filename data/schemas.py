@@ -1,6 +1,6 @@
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, ConfigDict, Field, field_validator, model_validator
 from datetime import date as dt_date, datetime
-from typing import Optional
+from typing import Any, Dict, List, Literal, Optional
 
 
 class ExpenseBase(BaseModel):
@@ -60,12 +60,57 @@ class ExpenseResponse(ExpenseBase):
     created_at: Optional[datetime] = None
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
-        json_encoders = {
-            datetime: lambda v: v.isoformat() if v else None,
-            dt_date: lambda v: v.isoformat() if v else None
-        }
+    # Dates and datetimes serialize to ISO 8601 natively in pydantic v2
+    model_config = ConfigDict(from_attributes=True)
+
+
+class BulkRowError(BaseModel):
+    """A single rejected row from a bulk ingestion request"""
+    index: int = Field(..., description="Zero-based position of the row in the request")
+    error: str
+
+
+class ExpenseBulkResponse(BaseModel):
+    """Schema for bulk ingestion results"""
+    received: int
+    created: int
+    failed: int
+    errors: List[BulkRowError] = []
+
+
+class CategoryPredictionBatch(BaseModel):
+    """Schema for categorizing many descriptions in one request"""
+    descriptions: List[str] = Field(..., min_length=1, description="Expense descriptions to categorize")
+
+
+class AnalysisJobCreate(BaseModel):
+    """Schema for submitting a background ML analysis job"""
+    kind: Literal["anomalies", "forecast", "insights"]
+    days: int = Field(30, ge=1, le=365, description="Forecast horizon (forecast jobs only)")
+    user_id: Optional[int] = None
+    start_date: Optional[dt_date] = None
+    end_date: Optional[dt_date] = None
+    type: Optional[str] = None
+
+    @model_validator(mode='after')
+    def validate_window(self) -> 'AnalysisJobCreate':
+        if self.start_date and self.end_date and self.start_date > self.end_date:
+            raise ValueError("start_date must be on or before end_date")
+        return self
+
+
+class AnalysisJobResponse(BaseModel):
+    """Schema for background job status and results"""
+    id: str
+    kind: str
+    params: Dict[str, Any]
+    status: str = Field(..., description="queued, running, succeeded or failed")
+    submitted_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    timings: Dict[str, float] = {}
+    result: Optional[Any] = None
+    error: Optional[str] = None
 
 
 # Legacy alias for backward compatibility
@@ -1,34 +1,118 @@
 """
 Database configuration and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
 
+from config import settings
+from metrics import instrument_engine
+
 # Database URL - SQLite for simplicity
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./expenses.db")
 
-# Create engine
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in DATABASE_URL else {}
-)
 
-# Create session factory
+def to_async_url(url: str) -> str:
+    """Maps a synchronous database URL onto the matching asyncio driver"""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgres://"):
+        return url.replace("postgres://", "postgresql+asyncpg://", 1)
+    if url.startswith("postgresql://"):
+        return url.replace("postgresql://", "postgresql+asyncpg://", 1)
+    return url
+
+
+# Async URL used by the API routes; override to pick a different driver
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL", to_async_url(DATABASE_URL))
+
+
+def sqlite_pragmas(profile: str) -> list:
+    """Returns the PRAGMA statements applied to each connection for a storage profile"""
+    if profile != "tuned":
+        return []
+    return [
+        f"PRAGMA journal_mode={settings.SQLITE_JOURNAL_MODE}",
+        f"PRAGMA synchronous={settings.SQLITE_SYNCHRONOUS}",
+        f"PRAGMA cache_size={settings.SQLITE_CACHE_SIZE}",
+        f"PRAGMA mmap_size={settings.SQLITE_MMAP_SIZE}",
+        f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}",
+        "PRAGMA temp_store=MEMORY",
+    ]
+
+
+def _engine_kwargs(url: str) -> dict:
+    """Pool sizing shared by the sync and async engines"""
+    kwargs = {}
+    if "sqlite" in url:
+        kwargs["connect_args"] = {"check_same_thread": False}
+    # In-memory SQLite uses a single shared connection, so there is no pool to size
+    if ":memory:" not in url:
+        kwargs.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    return kwargs
+
+
+def configure_storage(sync_engine: Engine, profile: str = settings.DB_STORAGE_PROFILE) -> None:
+    """Registers a connect hook applying the storage profile pragmas (SQLite only)"""
+    if sync_engine.dialect.name != "sqlite":
+        return
+    pragmas = sqlite_pragmas(profile)
+    if not pragmas:
+        return
+
+    @event.listens_for(sync_engine, "connect")
+    def _apply_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for pragma in pragmas:
+            cursor.execute(pragma)
+        cursor.close()
+
+
+def build_engine(url: str = DATABASE_URL, profile: str = settings.DB_STORAGE_PROFILE) -> Engine:
+    """Creates a synchronous engine with the configured pool and storage profile"""
+    sync_engine = create_engine(url, **_engine_kwargs(url))
+    configure_storage(sync_engine, profile)
+    instrument_engine(sync_engine)
+    return sync_engine
+
+
+# Create engine (scripts, table creation and other synchronous callers)
+engine = build_engine(DATABASE_URL)
+
+# Create async engine (API routes) so queries yield to the event loop
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_kwargs(ASYNC_DATABASE_URL))
+configure_storage(async_engine.sync_engine)
+instrument_engine(async_engine.sync_engine)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    # Keep attributes loaded after commit; lazy refreshes are not allowed in async code
+    expire_on_commit=False
+)
+
+def dialect_insert(dialect_name: str):
+    """Returns the dialect insert() that supports ON CONFLICT upserts"""
+    return postgresql.insert if dialect_name == "postgresql" else sqlite.insert
 
 # Base class for models
 Base = declarative_base()
 
 # Dependency to get DB session
-def get_db():
+async def get_db():
     """
-    Database session dependency for FastAPI routes
-    Yields a database session and ensures it's closed after use
+    Async database session dependency for FastAPI routes
+    Yields an AsyncSession and ensures it's closed after use
     """
-    db = SessionLocal()
-    try:
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
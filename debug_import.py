@@ -1,18 +1,128 @@
+"""
+Import-time report for the API
 
+Imports a module (default: main) in a fresh interpreter with
+`-X importtime`, then, for main, starts the app and serves one /health
+request against a scratch database. Prints the import and startup times,
+the import cost per top-level package and any heavy modules pulled in by
+the import itself (pandas, scikit-learn and dateparser are meant to load
+on first use or in the background model warm-up).
+
+Exits non-zero if the import fails, import + startup exceeds --budget-ms,
+or a --forbid module was imported, so it can gate CI. On import errors the
+traceback is also written to error_log.txt.
+
+Usage:
+    python debug_import.py [--module main] [--budget-ms 2500] [--top 10] [--json]
+"""
+import argparse
+import json
+import os
+import subprocess
 import sys
-import traceback
-
-try:
-    print("Importing data.schemas...")
-    from data import schemas
-    print("Importing models...")
-    import models
-    print("Importing ml.parser...")
-    from ml import parser
-    print("Importing api.routes...")
-    from api import routes
-    print("Success")
-except Exception:
-    with open("error_log.txt", "w") as f:
-        traceback.print_exc(file=f)
-    traceback.print_exc()
+import tempfile
+from collections import defaultdict
+
+DEFAULT_BUDGET_MS = 2500
+DEFAULT_FORBIDDEN = "pandas,sklearn,scipy,dateparser,joblib"
+
+# Runs in the child interpreter; the last stdout line is the JSON result
+CHILD = """
+import importlib, json, sys, time
+start = time.perf_counter()
+module = importlib.import_module({module!r})
+imported = time.perf_counter()
+# Snapshot before startup, which loads the model in the background
+modules = sorted(sys.modules)
+if {module!r} == "main":
+    from fastapi.testclient import TestClient
+    with TestClient(module.app) as client:
+        client.get("/health").raise_for_status()
+ready = time.perf_counter()
+print(json.dumps({{
+    "import_ms": (imported - start) * 1000,
+    "startup_ms": (ready - imported) * 1000,
+    "modules": modules,
+}}))
+"""
+
+
+def parse_importtime(stderr: str) -> dict:
+    """Sums the self time (µs) of every imported module per top-level package"""
+    per_package = defaultdict(int)
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, _, name = line[len("import time:"):].split("|")
+        per_package[name.strip().split(".")[0]] += int(self_us)
+    return per_package
+
+
+def run_report(module: str) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ, DATABASE_URL=f"sqlite:///{os.path.join(tmp, 'import.db')}", PYTHONWARNINGS="ignore")
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", CHILD.format(module=module)],
+            capture_output=True, text=True, env=env, cwd=os.path.dirname(os.path.abspath(__file__))
+        )
+    if proc.returncode != 0:
+        traceback = "\n".join(l for l in proc.stderr.splitlines() if not l.startswith("import time:"))
+        with open("error_log.txt", "w") as f:
+            f.write(traceback)
+        print(traceback, file=sys.stderr)
+        sys.exit(proc.returncode)
+
+    result = json.loads(proc.stdout.strip().splitlines()[-1])
+    result["packages_ms"] = {
+        name: round(us / 1000, 1)
+        for name, us in sorted(parse_importtime(proc.stderr).items(), key=lambda item: -item[1])
+    }
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS, help="Maximum import + startup time")
+    parser.add_argument("--forbid", default=DEFAULT_FORBIDDEN, help="Comma-separated modules that must not be imported")
+    parser.add_argument("--top", type=int, default=10, help="Packages listed in the report")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args()
+
+    result = run_report(args.module)
+    total_ms = result["import_ms"] + result["startup_ms"]
+    forbidden = [name for name in args.forbid.split(",") if name and name in result["modules"]]
+    failures = []
+    if total_ms > args.budget_ms:
+        failures.append(f"import + startup took {total_ms:.0f} ms, budget is {args.budget_ms:.0f} ms")
+    if forbidden:
+        failures.append(f"imported eagerly: {', '.join(forbidden)}")
+
+    if args.json:
+        print(json.dumps({
+            "module": args.module,
+            "import_ms": round(result["import_ms"], 1),
+            "startup_ms": round(result["startup_ms"], 1),
+            "budget_ms": args.budget_ms,
+            "packages_ms": result["packages_ms"],
+            "forbidden_imported": forbidden,
+            "ok": not failures,
+        }, indent=2))
+    else:
+        print(f"Import {args.module}: {result['import_ms']:.0f} ms")
+        print(f"Startup to first /health: {result['startup_ms']:.0f} ms")
+        print("\nSlowest packages (self time of all their modules):")
+        for name, ms in list(result["packages_ms"].items())[:args.top]:
+            print(f"  {name:<24} {ms:>8.1f} ms")
+        print()
+        for failure in failures:
+            print(f"FAIL: {failure}")
+        if not failures:
+            print(f"OK: within the {args.budget_ms:.0f} ms budget")
+
+    if failures:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
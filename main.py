@@ -1,10 +1,21 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from api.routes import router as api_router
+from metrics import MetricsMiddleware, registry, CONTENT_TYPE
+from ml.predictor import ExpenseML
+from config import settings
+import asyncio
+import logging
 import time
 from datetime import datetime
 
+# Application logs (memory peaks, sampled-mode warnings) at the configured level
+logging.basicConfig(
+    level=settings.LOG_LEVEL.upper(),
+    format="%(asctime)s %(levelname)s %(name)s: %(message)s"
+)
+
 # Application metadata
 app = FastAPI(
     title="Intelligent Expense Tracker API",
@@ -32,13 +43,25 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag", "X-Profile-Id"],
 )
 
+# Per-route latency histograms for /metrics
+app.add_middleware(MetricsMiddleware)
+
+# Sampling profiler for selected requests (see profiling.py)
+if settings.PROFILING_ENABLED:
+    from profiling import ProfilingMiddleware, router as profiling_router
+    app.add_middleware(ProfilingMiddleware)
+    app.include_router(profiling_router)
+
 # Startup event
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
-    from database import engine
+    from database import engine, SessionLocal
+    from sqlalchemy import text
+    from services.rollup_service import ensure_rollups
     import models
     
     print("🚀 Starting Intelligent Expense Tracker API...")
@@ -47,16 +70,66 @@ async def startup_event():
     # Create database tables
     print("📦 Initializing database...")
     models.Base.metadata.create_all(bind=engine)
+    # create_all skips existing tables, so add any indexes introduced since
+    for table in models.Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
+    # ...and drop retired ones. ix_expenses_date already orders by
+    # (date, id) since id is the rowid, so this one only cost writes
+    with engine.begin() as conn:
+        conn.execute(text("DROP INDEX IF EXISTS ix_expenses_date_id"))
+    
+    # Backfill the rollup tables for databases created before they existed
+    with SessionLocal() as db:
+        rebuilt = ensure_rollups(db)
+    if rebuilt:
+        print(f"📈 Rebuilt expense rollups ({rebuilt['daily']} daily rows)")
     print("✅ Database initialized successfully")
     
+    # Load and warm the categorization model and the parser worker
+    # processes in the background; /ready reports 503 until both are done
+    app.state.model_warmup = asyncio.create_task(warm_up_model())
+    app.state.worker_warmup = asyncio.create_task(warm_up_workers())
+    
     print("📊 API Documentation: http://localhost:8000/docs")
 
 
+async def warm_up_model():
+    """Loads the categorization model and runs a dummy inference off the event loop"""
+    from services.executors import threads
+    
+    info = await threads.run(ExpenseML.warm_up)
+    if ExpenseML.is_ready():
+        print(f"🧠 Model {info['version']} loaded in {info['load_ms']:.0f} ms (warm-up {info['warmup_ms']:.0f} ms)")
+    else:
+        print(f"⚠️ Model warm-up failed: {info['error']}")
+
+
+async def warm_up_workers():
+    """Starts the parser worker processes so the first /ai/parse finds them warm"""
+    from services.executors import processes
+    
+    start = time.perf_counter()
+    await processes.start()
+    if processes.is_ready():
+        print(f"🧠 {processes.max_workers} parser workers warm in {(time.perf_counter() - start) * 1000:.0f} ms")
+    else:
+        print(f"⚠️ Parser worker warm-up failed: {processes.start_error}")
+
+
 # Shutdown event
 @app.on_event("shutdown")
 async def shutdown_event():
     """Cleanup on shutdown"""
+    from database import async_engine
+    from services.executors import shutdown_executors
+    
     print("👋 Shutting down Intelligent Expense Tracker API...")
+    # Stop warm-ups still in progress before their executors go away
+    for task in (app.state.model_warmup, app.state.worker_warmup):
+        task.cancel()
+    shutdown_executors()
+    await async_engine.dispose()
 
 # Root endpoint
 @app.get("/", tags=["General"])
@@ -69,6 +142,7 @@ async def root():
         "status": "online",
         "endpoints": {
             "health": "/health",
+            "ready": "/ready",
             "api": "/api/v1",
             "docs": "/docs"
         }
@@ -96,13 +170,43 @@ async def health_check():
         "services": {
             "api": "operational",
             "database": "in-memory",
-            "ml_models": "loaded"
+            "ml_models": "loaded" if ExpenseML.is_ready() else "not_loaded"
         },
+        "model": ExpenseML.model_info(),
         "version": "1.0.0"
     }
 
+# Readiness probe for load balancers / orchestrators
+@app.get("/ready", tags=["General"])
+async def readiness():
+    """
+    Returns 200 once the categorization model is loaded and warmed up and
+    the parser worker processes are running, 503 before that (or if either
+    warm-up failed). Use /health for liveness.
+    """
+    from services.executors import processes
+    
+    model = ExpenseML.model_info()
+    workers = {"ready": processes.is_ready(), "error": processes.start_error}
+    if not (ExpenseML.is_ready() and processes.is_ready()):
+        failed = model["error"] or workers["error"]
+        return JSONResponse(
+            status_code=503,
+            content={"status": "failed" if failed else "warming_up", "model": model, "workers": workers}
+        )
+    return {"status": "ready", "model": model, "workers": workers}
+
+# Prometheus scrape endpoint
+@app.get("/metrics", tags=["General"], include_in_schema=False)
+async def metrics():
+    """
+    Exports request latency, DB query time, rows loaded, ML timings,
+    executor queues and cache hit ratios in Prometheus text format
+    """
+    return Response(content=registry.render(), media_type=CONTENT_TYPE)
+
 # Include API routes
-app.include_router(api_router, prefix="/api/v1")
+app.include_router(api_router)
 
 # Global exception handler
 @app.exception_handler(Exception)
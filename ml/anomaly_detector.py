@@ -4,19 +4,21 @@ from sklearn.ensemble import IsolationForest
 from sklearn.preprocessing import StandardScaler, OneHotEncoder
 from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from data.schemas import Expense
+from data.loader import as_expense_frame
+from metrics import ML_LATENCY
 
 class AnomalyDetector:
     @staticmethod
-    def detect_statistical_outliers(expenses: List[Expense], z_threshold: float = 2.0) -> List[Dict[str, Any]]:
+    def detect_statistical_outliers(expenses: Union[List[Expense], pd.DataFrame], z_threshold: float = 2.0) -> List[Dict[str, Any]]:
         """Detects anomalies using Z-score (Category-wise)."""
         if len(expenses) < 3:
             return []
 
-        df = pd.DataFrame([e.model_dump() for e in expenses])
+        df = as_expense_frame(expenses)
         results = []
-        for category, group in df.groupby('category'):
+        for category, group in df.groupby('category', observed=True):
             if len(group) < 3: continue
             mean, std = group['amount'].mean(), group['amount'].std()
             if std == 0: continue
@@ -36,41 +38,61 @@ class AnomalyDetector:
         return results
 
     @staticmethod
-    def detect_ml_anomalies(expenses: List[Expense], contamination: float = 0.05) -> List[Dict[str, Any]]:
+    def detect_ml_anomalies(expenses: Union[List[Expense], pd.DataFrame], contamination: float = 0.05) -> List[Dict[str, Any]]:
         """
         Sophisticated ML-based anomaly detection using Isolation Forest with feature engineering.
         Uses: amount, category, and day of week.
+        Accepts a frame from the columnar loader or a list of expenses.
         """
         if len(expenses) < 10:
             return []
 
-        df = pd.DataFrame([e.model_dump() for e in expenses])
-        
+        df = as_expense_frame(expenses)
+        preprocessor, model = AnomalyDetector.fit_ml_model(df, contamination)
+        return AnomalyDetector.score_ml_anomalies(df, preprocessor, model)
+
+    @staticmethod
+    def _features(df: pd.DataFrame) -> pd.DataFrame:
         # Feature Engineering: 1. Day of Week
-        df['date'] = pd.to_datetime(df['date'])
-        df['day_of_week'] = df['date'].dt.dayofweek
-        
-        # Prepare features
-        features = ['amount', 'category', 'day_of_week']
-        X = df[features]
+        # (assign() builds the feature frame without mutating the caller's frame)
+        return df[['amount', 'category']].assign(day_of_week=df['date'].dt.dayofweek)
+
+    @staticmethod
+    def fit_ml_model(df: pd.DataFrame, contamination: float = 0.05):
+        """
+        Fits the feature preprocessor and Isolation Forest on a frame.
+        The fitted pair can score other frames, e.g. chunks of a larger set
+        when the model was fitted on a sample.
 
+        Returns:
+            tuple: (fitted ColumnTransformer, fitted IsolationForest)
+        """
         # Define preprocessing for numerical and categorical features
         preprocessor = ColumnTransformer(
             transformers=[
                 ('num', StandardScaler(), ['amount', 'day_of_week']),
                 ('cat', OneHotEncoder(handle_unknown='ignore'), ['category'])
-            ])
+            ],
+            # Always emit CSR: the default threshold (0.3) densifies a few
+            # numeric columns plus a handful of categories
+            sparse_threshold=1.0)
 
         # Pipeline: Preprocessing -> Isolation Forest
         # Note: IsolationForest doesn't support pipelines directly in fit() for score_samples 
-        # so we transform first.
-        X_transformed = preprocessor.fit_transform(X)
-        if hasattr(X_transformed, "toarray"):
-            X_transformed = X_transformed.toarray()
+        # so we transform first. IsolationForest accepts the sparse matrix
+        # as is, so the one-hot block is never expanded into a dense copy.
+        X_transformed = preprocessor.fit_transform(AnomalyDetector._features(df))
 
         model = IsolationForest(contamination=contamination, random_state=42)
-        model.fit(X_transformed)
-        
+        with ML_LATENCY.time(operation="isolation_forest_fit"):
+            model.fit(X_transformed)
+        return preprocessor, model
+
+    @staticmethod
+    def score_ml_anomalies(df: pd.DataFrame, preprocessor, model) -> List[Dict[str, Any]]:
+        """Flags the rows of df that a fitted model considers anomalous."""
+        X_transformed = preprocessor.transform(AnomalyDetector._features(df))
+
         # Predictions (-1 for anomaly, 1 for normal)
         predictions = model.predict(X_transformed)
         scores = model.decision_function(X_transformed) # Lower is more anomalous
@@ -1,46 +1,80 @@
 import pandas as pd
 import random
-from datetime import datetime, timedelta
+from datetime import date, timedelta
+from typing import Any, Dict, Iterator, Optional, Sequence
+
+CATEGORY_MAP = {
+    'Food': ["Strbucks cofee", "sttarbucks", "Coffee!!", "Lunch at MCD", "Subway sandwich", "Groceries", "Dinner at Palace"],
+    'Transport': ["Uber ridee", "UBER   123", "uberrr", "Gas station", "Petrol refill", "Bus ticket", "Train pass"],
+    'Utilities': ["Electcity bill", "Elec Bill - Jan", "bill for power", "Water bill", "Internet Comcast", "Mobile recharge"],
+    'Shopping': ["Amzon prime sub", "amzn mktp", "Amazon.com*123", "Walmrt grocceries", "WAL-MART #456", "Target store"],
+    'Health': ["Pfizer meds", "pharmacy - CVS", "meds...", "Doctor visit", "Gym membership", "Hospital bill"],
+    'Entertainment': ["Netflix subscription", "NETFLIX.COM", "movie night", "Cinema tickets", "Steam games", "Spotify"]
+}
+
+# Formats used for the noisy training CSV
+NOISY_DATE_FORMATS = ["%Y-%m-%d", "%d/%m/%Y", "%m-%d-%Y", "%b %d, %Y"]
+
+
+def generate_expenses(
+    n: int,
+    seed: Optional[int] = None,
+    start_date: date = date(2025, 12, 1),
+    days: int = 45,
+    users: Optional[int] = None,
+    date_formats: Optional[Sequence[str]] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Yields n synthetic, noisy expense records (ids 1..n).
+
+    Records are generated lazily, so very large datasets (e.g. 1M rows for
+    benchmarks) can be streamed into a database without materializing them.
+
+    Args:
+        n: Number of records
+        seed: Seed for a reproducible dataset (None for random)
+        start_date: First possible expense date
+        days: Dates are spread over start_date .. start_date + days
+        users: If set, adds user_id (1..users) and type fields
+        date_formats: If set, dates are strings in a randomly chosen format;
+            otherwise date objects
+    """
+    rng = random.Random(seed)
+    categories = list(CATEGORY_MAP.keys())
+
+    for i in range(n):
+        cat = rng.choice(categories)
+        desc = rng.choice(CATEGORY_MAP[cat])
 
-def generate_noisy_data():
-    category_map = {
-        'Food': ["Strbucks cofee", "sttarbucks", "Coffee!!", "Lunch at MCD", "Subway sandwich", "Groceries", "Dinner at Palace"],
-        'Transport': ["Uber ridee", "UBER   123", "uberrr", "Gas station", "Petrol refill", "Bus ticket", "Train pass"],
-        'Utilities': ["Electcity bill", "Elec Bill - Jan", "bill for power", "Water bill", "Internet Comcast", "Mobile recharge"],
-        'Shopping': ["Amzon prime sub", "amzn mktp", "Amazon.com*123", "Walmrt grocceries", "WAL-MART #456", "Target store"],
-        'Health': ["Pfizer meds", "pharmacy - CVS", "meds...", "Doctor visit", "Gym membership", "Hospital bill"],
-        'Entertainment': ["Netflix subscription", "NETFLIX.COM", "movie night", "Cinema tickets", "Steam games", "Spotify"]
-    }
-    
-    data = []
-    base_date = datetime(2025, 12, 1)
-    
-    for i in range(500): # Increase to 500 samples
-        cat = random.choice(list(category_map.keys()))
-        desc = random.choice(category_map[cat])
-        
         # Randomly jitter data
-        if random.random() > 0.8:
+        if rng.random() > 0.8:
             desc = desc.lower()
-        if random.random() > 0.9:
+        if rng.random() > 0.9:
             desc = desc.replace(' ', '  ')
-            
-        amt = round(random.uniform(5.0, 500.0), 2)
-        
-        # Varied date formats
-        d = base_date + timedelta(days=random.randint(0, 45))
-        date_formats = ["%Y-%m-%d", "%d/%m/%Y", "%m-%d-%Y", "%b %d, %Y"]
-        date_str = d.strftime(random.choice(date_formats))
-        
-        data.append({
+
+        amt = round(rng.uniform(5.0, 500.0), 2)
+
+        d = start_date + timedelta(days=rng.randint(0, days))
+        if date_formats:
+            # Varied date formats
+            d = d.strftime(rng.choice(date_formats))
+
+        record = {
             "id": i + 1,
             "description": desc,
             "amount": amt,
             "category": cat,
-            "date": date_str
-        })
-        
-    df = pd.DataFrame(data)
+            "date": d
+        }
+        if users:
+            record["user_id"] = rng.randint(1, users)
+            record["type"] = "expense"
+        yield record
+
+
+def generate_noisy_data():
+    # Increase to 500 samples
+    df = pd.DataFrame(list(generate_expenses(500, date_formats=NOISY_DATE_FORMATS)))
     df.to_csv("data/raw_expenses.csv", index=False)
     print(f"Generated {len(df)} records in data/raw_expenses.csv")
 
@@ -1,69 +1,80 @@
 import pandas as pd
 import numpy as np
 from sklearn.linear_model import LinearRegression
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Union
 from data.schemas import Expense
+from data.loader import as_expense_frame
+from metrics import ML_LATENCY
 from datetime import datetime, timedelta
 
 class ExpenseForecaster:
     @staticmethod
-    def forecast_spending(expenses: List[Expense], periods: int = 30) -> Dict[str, Any]:
+    def forecast_spending(expenses: Union[List[Expense], pd.DataFrame], periods: int = 30) -> Dict[str, Any]:
         """
         Forecasts daily spending for the next 'periods' days using Linear Regression.
+        Accepts a frame from the columnar loader or a list of expenses.
         """
         if len(expenses) < 10:
             return {"error": "Not enough data for forecasting (minimum 10 records required)"}
 
-        df = pd.DataFrame([e.model_dump() for e in expenses])
-        df['date'] = pd.to_datetime(df['date'])
+        df = as_expense_frame(expenses)
         
         # Aggregate spending by date
         daily_spend = df.groupby('date')['amount'].sum().reset_index()
-        daily_spend = daily_spend.sort_values('date')
+        return ExpenseForecaster.forecast_daily(daily_spend, periods)
 
-        # Fill missing dates with 0 to have a continuous time series
-        all_dates = pd.date_range(start=daily_spend['date'].min(), end=daily_spend['date'].max(), freq='D')
-        daily_spend = daily_spend.set_index('date').reindex(all_dates, fill_value=0).reset_index()
-        daily_spend.columns = ['date', 'amount']
+    @staticmethod
+    def forecast_daily(daily_spend: pd.DataFrame, periods: int = 30) -> Dict[str, Any]:
+        """
+        Forecasts from an already aggregated daily series (columns: date, amount),
+        e.g. read from the daily rollup table.
+        """
+        with ML_LATENCY.time(operation="forecast"):
+            daily_spend = daily_spend.sort_values('date')
+
+            # Fill missing dates with 0 to have a continuous time series
+            all_dates = pd.date_range(start=daily_spend['date'].min(), end=daily_spend['date'].max(), freq='D')
+            daily_spend = daily_spend.set_index('date').reindex(all_dates, fill_value=0).reset_index()
+            daily_spend.columns = ['date', 'amount']
 
-        # Feature engineering: days since start
-        start_date = daily_spend['date'].min()
-        daily_spend['day_num'] = (daily_spend['date'] - start_date).dt.days
+            # Feature engineering: days since start
+            start_date = daily_spend['date'].min()
+            daily_spend['day_num'] = (daily_spend['date'] - start_date).dt.days
         
-        # Train Linear Regression model
-        X = daily_spend[['day_num']].values
-        y = daily_spend['amount'].values
+            # Train Linear Regression model
+            X = daily_spend[['day_num']].values
+            y = daily_spend['amount'].values
         
-        model = LinearRegression()
-        model.fit(X, y)
+            model = LinearRegression()
+            model.fit(X, y)
         
-        # Forecast for next N days
-        last_day = daily_spend['day_num'].max()
-        forecast_days = np.array(range(last_day + 1, last_day + 1 + periods)).reshape(-1, 1)
-        predictions = model.predict(forecast_days)
+            # Forecast for next N days
+            last_day = daily_spend['day_num'].max()
+            forecast_days = np.array(range(last_day + 1, last_day + 1 + periods)).reshape(-1, 1)
+            predictions = model.predict(forecast_days)
         
-        # Ensure no negative forecasts
-        predictions = np.maximum(predictions, 0)
+            # Ensure no negative forecasts
+            predictions = np.maximum(predictions, 0)
         
-        forecast_dates = [start_date + timedelta(days=int(d)) for d in forecast_days.flatten()]
+            forecast_dates = [start_date + timedelta(days=int(d)) for d in forecast_days.flatten()]
         
-        results = [
-            {"date": d.strftime("%Y-%m-%d"), "forecasted_amount": float(a)}
-            for d, a in zip(forecast_dates, predictions)
-        ]
+            results = [
+                {"date": d.strftime("%Y-%m-%d"), "forecasted_amount": float(a)}
+                for d, a in zip(forecast_dates, predictions)
+            ]
         
-        total_forecasted = sum(predictions)
+            total_forecasted = sum(predictions)
         
-        # Trend analysis
-        slope = model.coef_[0]
-        trend = "increasing" if slope > 0.01 else "decreasing" if slope < -0.01 else "stable"
+            # Trend analysis
+            slope = model.coef_[0]
+            trend = "increasing" if slope > 0.01 else "decreasing" if slope < -0.01 else "stable"
 
-        return {
-            "forecast": results,
-            "total_forecasted_spend": float(total_forecasted),
-            "trend": trend,
-            "days_ahead": periods
-        }
+            return {
+                "forecast": results,
+                "total_forecasted_spend": float(total_forecasted),
+                "trend": trend,
+                "days_ahead": periods
+            }
 
 if __name__ == "__main__":
     # Test
@@ -1,30 +1,51 @@
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional, Union
 from data.schemas import Expense
+from data.loader import as_expense_frame
 from ml.predictor import ExpenseML
 from ml.anomaly_detector import AnomalyDetector
 from ml.forecaster import ExpenseForecaster
 
 class InsightEngine:
     @staticmethod
-    def generate_insights(expenses: List[Expense]) -> List[Dict[str, Any]]:
+    def generate_insights(
+        expenses: Union[List[Expense], pd.DataFrame],
+        category_totals: Optional[Dict[str, float]] = None,
+        daily_spend: Optional[pd.DataFrame] = None,
+        anomalies: Optional[List[Dict[str, Any]]] = None,
+        transaction_count: Optional[int] = None
+    ) -> List[Dict[str, Any]]:
+        """
+        Builds prioritized insights from the user's expenses.
+        Pre-aggregated category totals and a daily spending series (e.g. from
+        the rollup tables) are used when given instead of regrouping `expenses`.
+        When `expenses` is only a sample of a larger set, pass the anomalies
+        and transaction count computed over the full set.
+        """
         insights = []
-        if not expenses:
+        if len(expenses) == 0:
             return [{"type": "info", "message": "No data available to generate insights."}]
 
-        df = pd.DataFrame([e.model_dump() for e in expenses])
+        # Build the frame once and hand it to the anomaly/forecast models
+        df = as_expense_frame(expenses)
+        if transaction_count is None:
+            transaction_count = len(df)
         
+        if category_totals is not None:
+            category_totals = pd.Series(category_totals, dtype=float)
+        else:
+            category_totals = df.groupby('category', observed=True)['amount'].sum()
+
         # 1. Total Spending Insight
-        total_spend = df['amount'].sum()
+        total_spend = category_totals.sum()
         insights.append({
             "type": "summary",
             "title": "Total Spending Overview",
-            "message": f"You have spent a total of ₹{total_spend:,.2f} across {len(expenses)} transactions.",
+            "message": f"You have spent a total of ₹{total_spend:,.2f} across {transaction_count} transactions.",
             "priority": "low"
         })
 
         # 2. Category Concentration Insight
-        category_totals = df.groupby('category')['amount'].sum()
         if not category_totals.empty:
             top_category = category_totals.idxmax()
             top_amount = category_totals.max()
@@ -38,7 +59,8 @@ class InsightEngine:
             })
 
         # 3. Anomaly Insights
-        anomalies = AnomalyDetector.detect_ml_anomalies(expenses)
+        if anomalies is None:
+            anomalies = AnomalyDetector.detect_ml_anomalies(df)
         if anomalies:
             insights.append({
                 "type": "anomaly_alert",
@@ -48,9 +70,13 @@ class InsightEngine:
                 "priority": "high"
             })
 
-        # 4. Forecasting Insights
-        if len(expenses) >= 10:
-            forecast = ExpenseForecaster.forecast_spending(expenses, periods=30)
+        # 4. Forecasting Insights (computed once, reused by the saving tip)
+        forecast = {}
+        if transaction_count >= 10:
+            if daily_spend is not None:
+                forecast = ExpenseForecaster.forecast_daily(daily_spend, periods=30)
+            else:
+                forecast = ExpenseForecaster.forecast_spending(df, periods=30)
             if "total_forecasted_spend" in forecast:
                 trend = forecast["trend"]
                 future_spend = forecast["total_forecasted_spend"]
@@ -64,15 +90,13 @@ class InsightEngine:
 
         # 5. Saving Opportunity (If trend is increasing)
         # (Simplified logic for now)
-        if len(expenses) >= 10:
-             forecast = ExpenseForecaster.forecast_spending(expenses, periods=30)
-             if forecast.get("trend") == "increasing":
-                 insights.append({
-                     "type": "saving_tip",
-                     "title": "Saving Opportunity",
-                     "message": "Your spending is on an upward trend. High-impact areas like food and subscriptions could be optimized to save ₹200-500 next month.",
-                     "priority": "medium"
-                 })
+        if forecast.get("trend") == "increasing":
+            insights.append({
+                "type": "saving_tip",
+                "title": "Saving Opportunity",
+                "message": "Your spending is on an upward trend. High-impact areas like food and subscriptions could be optimized to save ₹200-500 next month.",
+                "priority": "medium"
+            })
 
         return insights
 
@@ -1,11 +1,31 @@
 import re
-import dateparser
 from datetime import datetime
 from typing import Dict, Any, Optional
 
 class ExpenseParser:
     @staticmethod
     def parse_text(text: str) -> Dict[str, Any]:
+        result = ExpenseParser.extract_fields(text)
+
+        # 4. Predict Category
+        from ml.predictor import ExpenseML
+        prediction = ExpenseML.predict_category(result["description"])
+        result["category"] = prediction.get("category", "Uncategorized")
+        result["confidence"] = prediction.get("confidence", 0.0)
+        
+        return result
+
+    @staticmethod
+    def warm_up() -> None:
+        # Imports dateparser and builds its language data so the first
+        # request in a worker process does not pay for it
+        ExpenseParser.extract_fields("warm up 1 yesterday")
+
+    @staticmethod
+    def extract_fields(text: str) -> Dict[str, Any]:
+        # Amount, date and cleaned description only (no model needed), so the
+        # API can run this in a worker process and predict the category in
+        # its own process, where the model and prediction cache live
         result = {
             "amount": None,
             "date": datetime.now().strftime("%Y-%m-%d"),
@@ -47,6 +67,8 @@ class ExpenseParser:
         date_keywords = r'\b(yesterday|today|last\s\w+|on\s\d{1,2}[/-]\d{1,2}[/-]?\d{0,4})\b'
         date_match = re.search(date_keywords, temp_desc, re.IGNORECASE)
         
+        # Imported on first use: dateparser takes ~0.5s to import
+        import dateparser
         parsed_date = dateparser.parse(temp_desc, settings={'PREFER_DATES_FROM': 'past'})
         
         if parsed_date:
@@ -66,12 +88,6 @@ class ExpenseParser:
         description = clean_desc if clean_desc else text.strip()
         result["description"] = description
         
-        # 4. Predict Category
-        from ml.predictor import ExpenseML
-        prediction = ExpenseML.predict_category(description)
-        result["category"] = prediction.get("category", "Uncategorized")
-        result["confidence"] = prediction.get("confidence", 0.0)
-        
         return result
 
 if __name__ == "__main__":
@@ -1,62 +1,224 @@
-import pandas as pd
-import joblib
+import hashlib
+import logging
 import os
-from typing import List, Dict, Any
+import threading
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, List, Dict, Any, Optional, Tuple, Union
 from data.schemas import Expense
+from data.loader import as_expense_frame
 from ml.preprocessing import clean_text
+from metrics import ML_LATENCY
+from config import settings
+from cache import ResultCache, register_cache_metrics
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = "ml/model.pkl"
+VECTORIZER_PATH = "ml/vectorizer.pkl"
+
+# Merchant strings repeat constantly, so predictions are memoized by
+# (model version, cleaned description). Entries never go stale for their
+# version; reload_model() clears the cache to free the old ones. Each API
+# worker process keeps its own cache.
+prediction_cache = ResultCache(settings.PREDICTION_CACHE_SIZE, ttl_seconds=None)
+register_cache_metrics("prediction", prediction_cache)
+
+
+def _model_version(*paths: str) -> str:
+    """Content hash of the model artifacts, so a retrained model gets a new version"""
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:12]
+
 
 class ExpenseML:
     _model = None
     _vectorizer = None
+    _load_lock = threading.Lock()
+    _model_info: Dict[str, Any] = {"loaded": False, "version": None}
+    _warmed_up = False
+    _warmup_error: Optional[str] = None
+
+    @staticmethod
+    def _read_artifacts() -> Optional[Tuple[Any, Any, Dict[str, Any]]]:
+        """
+        Unpickles model and vectorizer without touching the class state.
+
+        Returns:
+            tuple: (model, vectorizer, model info), or None if the files are missing
+        """
+        if not (os.path.exists(MODEL_PATH) and os.path.exists(VECTORIZER_PATH)):
+            return None
+
+        # Unpickling pulls in scikit-learn; keep it out of API import
+        import joblib
+
+        start = time.perf_counter()
+        model = joblib.load(MODEL_PATH)
+        vectorizer = joblib.load(VECTORIZER_PATH)
+        info = {
+            "loaded": True,
+            "version": _model_version(MODEL_PATH, VECTORIZER_PATH),
+            "loaded_at": datetime.now().isoformat(),
+            "load_ms": round((time.perf_counter() - start) * 1000, 3),
+        }
+        return model, vectorizer, info
+
+    @classmethod
+    def _install(cls, model, vectorizer, info: Dict[str, Any]) -> None:
+        # Caller holds _load_lock. Model first, then version: a prediction
+        # racing a reload may cache a new-model result under the old
+        # version, which is never read again
+        cls._model, cls._vectorizer = model, vectorizer
+        cls._model_info = info
 
     @classmethod
     def load_model(cls):
         if cls._model is None or cls._vectorizer is None:
-            model_path = "ml/model.pkl"
-            vectorizer_path = "ml/vectorizer.pkl"
-            
-            if os.path.exists(model_path) and os.path.exists(vectorizer_path):
-                cls._model = joblib.load(model_path)
-                cls._vectorizer = joblib.load(vectorizer_path)
-            else:
+            # The slow unpickling runs outside the lock; only the swap is
+            # serialized, so a racing first load is wasted but never blocks
+            artifacts = cls._read_artifacts()
+            if artifacts is None:
                 return False
+            with cls._load_lock:
+                if cls._model is None or cls._vectorizer is None:
+                    cls._install(*artifacts)
         return True
 
+    @classmethod
+    def reload_model(cls) -> Dict[str, Any]:
+        """
+        Reloads the model artifacts from disk (e.g. after retraining) and
+        drops the cached predictions of the previous model.
+
+        Requests keep using the old model until the new one is loaded.
+
+        Raises:
+            FileNotFoundError: If the artifacts are missing
+        """
+        artifacts = cls._read_artifacts()
+        if artifacts is None:
+            raise FileNotFoundError(f"{MODEL_PATH} / {VECTORIZER_PATH} not found; run ml/train.py")
+        with cls._load_lock:
+            cls._install(*artifacts)
+        prediction_cache.clear()
+        return cls.model_info()
+
+    @classmethod
+    def warm_up(cls) -> Dict[str, Any]:
+        """
+        Loads the model and runs one dummy prediction.
+
+        The first inference initializes the vectorizer and model code paths,
+        so real requests do not pay for it. Errors are recorded rather than
+        raised; see model_info().
+
+        Returns:
+            dict: model_info() after warm-up
+        """
+        try:
+            start = time.perf_counter()
+            if not cls.load_model():
+                raise FileNotFoundError(f"{MODEL_PATH} / {VECTORIZER_PATH} not found; run ml/train.py")
+            cls.predict_category("warm up coffee")
+            cls._model_info["warmup_ms"] = round((time.perf_counter() - start) * 1000, 3)
+            cls._warmup_error = None
+        except Exception as e:
+            logger.exception("Model warm-up failed")
+            cls._warmup_error = str(e)
+        finally:
+            cls._warmed_up = True
+        return cls.model_info()
+
+    @classmethod
+    def model_info(cls) -> Dict[str, Any]:
+        """Loaded model version, load time and warm-up status"""
+        return {
+            **cls._model_info,
+            "warmed_up": cls._warmed_up,
+            "error": cls._warmup_error,
+        }
+
+    @classmethod
+    def is_ready(cls) -> bool:
+        """True once warm-up finished with the model loaded"""
+        return cls._warmed_up and cls._model_info["loaded"] and cls._warmup_error is None
+
     @staticmethod
-    def analyze_spending(expenses: List[Expense]):
-        if not expenses:
+    def analyze_spending(expenses: Union[List[Expense], "pd.DataFrame"]):
+        if len(expenses) == 0:
             return {"message": "No data to analyze"}
         
-        df = pd.DataFrame([e.model_dump() for e in expenses])
-        category_totals = df.groupby('category')['amount'].sum().to_dict()
+        df = as_expense_frame(expenses)
+        category_totals = df.groupby('category', observed=True)['amount'].sum().to_dict()
         
         return {
             "category_breakdown": category_totals,
-            "total_spending": df['amount'].sum(),
+            "total_spending": float(df['amount'].sum()),
             "highest_category": max(category_totals, key=category_totals.get) if category_totals else None
         }
 
+    @classmethod
+    def _score(cls, model, vectorizer, cleaned: List[str]) -> List[Dict[str, Any]]:
+        """
+        One vectorizer transform and one predict_proba call for the whole
+        list; the label is the argmax of the probabilities, so predict() is
+        never run separately.
+        """
+        probabilities = model.predict_proba(vectorizer.transform(cleaned))
+        best = probabilities.argmax(axis=1)
+        classes = [str(c) for c in model.classes_]
+
+        return [
+            {
+                "category": classes[idx],
+                "confidence": float(row[idx]),
+                "all_probabilities": {k: float(v) for k, v in zip(classes, row)}
+            }
+            for idx, row in zip(best, probabilities)
+        ]
+
+    @classmethod
+    def _predict(cls, descriptions: List[str], operation: str) -> List[Dict[str, Any]]:
+        """Serves repeated descriptions from prediction_cache and scores the rest in one call"""
+        model, vectorizer, version = cls._model, cls._vectorizer, cls._model_info["version"]
+        with ML_LATENCY.time(operation=operation):
+            cleaned = [clean_text(d) for d in descriptions]
+            results = [prediction_cache.get((version, text)) for text in cleaned]
+
+            # Each distinct uncached description is scored once
+            missing = list(dict.fromkeys(text for text, result in zip(cleaned, results) if result is None))
+            if missing:
+                scored = dict(zip(missing, cls._score(model, vectorizer, missing)))
+                for text, result in scored.items():
+                    prediction_cache.set((version, text), result)
+                results = [result if result is not None else scored[text] for text, result in zip(cleaned, results)]
+        return results
+
     @classmethod
     def predict_category(cls, description: str) -> Dict[str, Any]:
         """Predicts the category of an expense based on its description."""
         if not cls.load_model():
             return {"error": "Model not trained. Run ml/train.py first."}
+        return cls._predict([description], "predict_category")[0]
 
-        cleaned_desc = clean_text(description)
-        X_vec = cls._vectorizer.transform([cleaned_desc])
-        
-        prediction = cls._model.predict(X_vec)[0]
-        probabilities = cls._model.predict_proba(X_vec)[0]
-        
-        # Match probability with class names
-        prob_dict = dict(zip(cls._model.classes_, probabilities))
-        max_prob = max(probabilities)
-
-        return {
-            "category": prediction,
-            "confidence": float(max_prob),
-            "all_probabilities": {k: float(v) for k, v in prob_dict.items()}
-        }
+    @classmethod
+    def predict_categories(cls, descriptions: List[str]) -> List[Dict[str, Any]]:
+        """
+        Predicts categories for many descriptions with a single vectorizer
+        transform and a single predict_proba call. Results keep input order.
+        """
+        if not descriptions:
+            return []
+        if not cls.load_model():
+            return [{"error": "Model not trained. Run ml/train.py first."} for _ in descriptions]
+        return cls._predict(descriptions, "predict_categories")
 
 if __name__ == "__main__":
     # Test prediction
@@ -1,4 +1,3 @@
-import pandas as pd
 import re
 from datetime import datetime
 
@@ -13,6 +12,23 @@ def clean_text(text):
     text = " ".join(text.split())
     return text
 
+# Basic Typos/Abbreviations (Simple Rule-based for common cases)
+TYPO_MAP = {
+    'strbucks': 'starbucks',
+    'cofee': 'coffee',
+    'sttarbucks': 'starbucks',
+    'amzn': 'amazon',
+    'amzon': 'amazon',
+    'electcity': 'electricity',
+    'walmrt': 'walmart',
+    'grocceries': 'grocery'
+}
+
+def fix_common_typos(text):
+    words = text.split()
+    fixed_words = [TYPO_MAP.get(w, w) for w in words]
+    return " ".join(fixed_words)
+
 def normalize_date(date_str):
     formats = ["%Y-%m-%d", "%d/%m/%Y", "%m-%d-%Y", "%b %d, %Y"]
     for fmt in formats:
@@ -22,9 +38,26 @@ def normalize_date(date_str):
             continue
     return date_str # Fallback if no format matches
 
+def clean_descriptions(descriptions):
+    """
+    Cleans a Series of descriptions (clean_text + typo fixes).
+    Merchant strings repeat heavily, so each distinct value is cleaned once.
+    """
+    uniques = descriptions.dropna().unique()
+    mapping = {d: fix_common_typos(clean_text(d)) for d in uniques}
+    return descriptions.map(mapping).fillna("")
+
+def normalize_dates(dates):
+    """Normalizes a Series of date strings, parsing each distinct value once."""
+    uniques = dates.dropna().unique()
+    mapping = {d: normalize_date(str(d)) for d in uniques}
+    return dates.map(mapping)
+
 def process_pipeline():
     print("Starting preprocessing pipeline...")
     
+    import pandas as pd
+
     # Load raw data
     try:
         df = pd.read_csv("data/raw_expenses.csv")
@@ -33,31 +66,13 @@ def process_pipeline():
         return
 
     # 1. Text Cleaning
+    # 2. Basic Typos/Abbreviations (see TYPO_MAP)
     print("Cleaning descriptions...")
-    df['description_cleaned'] = df['description'].apply(clean_text)
+    df['description_cleaned'] = clean_descriptions(df['description'])
     
-    # 2. Date Normalization
+    # 3. Date Normalization
     print("Normalizing dates...")
-    df['date_normalized'] = df['date'].apply(normalize_date)
-    
-    # 3. Basic Typos/Abbreviations (Simple Rule-based for common cases)
-    typo_map = {
-        'strbucks': 'starbucks',
-        'cofee': 'coffee',
-        'sttarbucks': 'starbucks',
-        'amzn': 'amazon',
-        'amzon': 'amazon',
-        'electcity': 'electricity',
-        'walmrt': 'walmart',
-        'grocceries': 'grocery'
-    }
-    
-    def fix_common_typos(text):
-        words = text.split()
-        fixed_words = [typo_map.get(w, w) for w in words]
-        return " ".join(fixed_words)
-    
-    df['description_cleaned'] = df['description_cleaned'].apply(fix_common_typos)
+    df['date_normalized'] = normalize_dates(df['date'])
     
     # Save cleaned data
     output_path = "data/cleaned_expenses.csv"
@@ -1,7 +1,7 @@
 """
 Database models for the Intelligent Expense Tracker
 """
-from sqlalchemy import Column, Integer, String, Float, Date, DateTime
+from sqlalchemy import Column, Integer, String, Float, Date, DateTime, Index
 from sqlalchemy.sql import func
 from database import Base
 
@@ -12,6 +12,10 @@ class Expense(Base):
     Represents a single expense or income transaction
     """
     __tablename__ = "expenses"
+    __table_args__ = (
+        # Serves per-user analytics windows (user_id = ? AND date BETWEEN ? AND ?)
+        Index("ix_expenses_user_id_date", "user_id", "date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True, autoincrement=True)
     user_id = Column(Integer, nullable=True, index=True)
@@ -39,3 +43,45 @@ class Expense(Base):
             "created_at": self.created_at.isoformat() if self.created_at else None,
             "updated_at": self.updated_at.isoformat() if self.updated_at else None
         }
+
+
+class DailyRollup(Base):
+    """
+    Pre-aggregated totals per user x day x category x type.
+    Maintained in the same transaction as expense writes.
+    """
+    __tablename__ = "expense_daily_rollups"
+
+    # 0 stands for expenses without a user (NULLs would never conflict on upsert)
+    user_id = Column(Integer, primary_key=True, default=0)
+    day = Column(Date, primary_key=True)
+    category = Column(String(100), primary_key=True)
+    type = Column(String(20), primary_key=True)
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class MonthlyRollup(Base):
+    """
+    Pre-aggregated totals per user x month x category x type.
+    `month` holds the first day of the month.
+    """
+    __tablename__ = "expense_monthly_rollups"
+
+    user_id = Column(Integer, primary_key=True, default=0)
+    month = Column(Date, primary_key=True)
+    category = Column(String(100), primary_key=True)
+    type = Column(String(20), primary_key=True)
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class ChangeCounter(Base):
+    """
+    Monotonic change counter per table, bumped in the same transaction as
+    every write. Used to version cached analytics results across workers.
+    """
+    __tablename__ = "change_counters"
+
+    name = Column(String(50), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
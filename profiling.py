@@ -0,0 +1,236 @@
+"""
+On-demand request profiling
+
+When PROFILING_ENABLED is set, ProfilingMiddleware profiles a request if
+it carries a matching X-Profile-Token header or is picked by
+PROFILE_SAMPLE_RATE. A background thread samples the stacks of the
+request's event-loop thread, plus any executor threads running work the
+request submitted, via sys._current_frames(). The aggregated
+collapsed-stack artifact (flamegraph.pl / speedscope input) can then be
+fetched from GET /debug/profiles/{request_id}.
+
+Work sent to the process pool is not sampled. Other requests served by
+the same event loop while a profile runs show up in its loop-thread
+samples.
+
+With PROFILING_ENABLED off nothing here is registered, so requests pay
+nothing.
+"""
+import functools
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import APIRouter, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+
+from config import settings
+
+PROFILE_TOKEN_HEADER = "x-profile-token"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+_active_profiler: ContextVar[Optional["SamplingProfiler"]] = ContextVar("active_profiler", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _collapse(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_frame_label(frame))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class SamplingProfiler:
+    """Periodically samples the stacks of a set of threads"""
+
+    def __init__(self, interval_seconds: float):
+        self.interval_seconds = interval_seconds
+        self.thread_ids = {threading.get_ident()}
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval_seconds):
+            frames = sys._current_frames()
+            for thread_id in tuple(self.thread_ids):
+                frame = frames.get(thread_id)
+                if frame is not None:
+                    self.stacks[_collapse(frame)] += 1
+            self.samples += 1
+
+    def start(self) -> None:
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def collapsed(self) -> str:
+        """Stacks in collapsed format: root;...;leaf <count> per line"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.stacks.most_common())
+
+
+def bind_to_profile(fn: Callable) -> Callable:
+    """
+    Makes a thread-pool task join the current request's profile, if any.
+
+    Returns fn unchanged when the request is not being profiled.
+    """
+    profiler = _active_profiler.get()
+    if profiler is None:
+        return fn
+    return functools.partial(_run_profiled, profiler, fn)
+
+
+def _run_profiled(profiler: SamplingProfiler, fn: Callable) -> Any:
+    thread_id = threading.get_ident()
+    profiler.thread_ids.add(thread_id)
+    try:
+        return fn()
+    finally:
+        profiler.thread_ids.discard(thread_id)
+
+
+class ProfileStore:
+    """Keeps the most recent profiles by request id"""
+
+    def __init__(self, maxsize: int):
+        self.maxsize = maxsize
+        self._profiles: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profile: Dict[str, Any]) -> None:
+        with self._lock:
+            self._profiles[profile["request_id"]] = profile
+            while len(self._profiles) > self.maxsize:
+                self._profiles.popitem(last=False)
+
+    def get(self, request_id: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            return self._profiles.get(request_id)
+
+    def summaries(self) -> list:
+        with self._lock:
+            return [
+                {k: v for k, v in profile.items() if k != "collapsed"}
+                for profile in reversed(self._profiles.values())
+            ]
+
+
+profile_store = ProfileStore(settings.PROFILE_MAX_STORED)
+
+
+def _token_matches(token: Optional[str]) -> bool:
+    # compare_digest only accepts ASCII str, so compare the encoded bytes
+    return (
+        bool(settings.PROFILE_TOKEN)
+        and token is not None
+        and hmac.compare_digest(token.encode(), settings.PROFILE_TOKEN.encode())
+    )
+
+
+class ProfilingMiddleware:
+    """ASGI middleware profiling requests selected by token header or sample rate"""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _should_profile(self, scope) -> bool:
+        for name, value in scope["headers"]:
+            if name == PROFILE_TOKEN_HEADER.encode():
+                return _token_matches(value.decode("latin-1"))
+        return settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._should_profile(scope):
+            await self.app(scope, receive, send)
+            return
+
+        request_id = uuid.uuid4().hex
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                message["headers"] = list(message.get("headers", [])) + [
+                    (PROFILE_ID_HEADER.lower().encode(), request_id.encode())
+                ]
+            await send(message)
+
+        profiler = SamplingProfiler(settings.PROFILE_INTERVAL_MS / 1000)
+        context_token = _active_profiler.set(profiler)
+        start = time.perf_counter()
+        profiler.start()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            profiler.stop()
+            _active_profiler.reset(context_token)
+            profile_store.add({
+                "request_id": request_id,
+                "method": scope["method"],
+                "path": scope["path"],
+                "status": status_code,
+                "duration_ms": round((time.perf_counter() - start) * 1000, 3),
+                "interval_ms": settings.PROFILE_INTERVAL_MS,
+                "samples": profiler.samples,
+                "collapsed": profiler.collapsed(),
+            })
+
+
+# Retrieval endpoints, included only when profiling is enabled
+router = APIRouter(prefix="/debug/profiles", tags=["Debug"])
+
+
+def _require_token(x_profile_token: Optional[str]) -> None:
+    # Profiles expose stack frames and source paths, so without a configured
+    # PROFILE_TOKEN nobody can read them (sampled profiles are still taken)
+    if not settings.PROFILE_TOKEN:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Profile retrieval is disabled until PROFILE_TOKEN is set"
+        )
+    if not _token_matches(x_profile_token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="A valid X-Profile-Token header is required"
+        )
+
+
+@router.get("", summary="List recent request profiles")
+async def list_profiles(x_profile_token: Optional[str] = Header(None)):
+    """Returns metadata of the stored profiles, newest first"""
+    _require_token(x_profile_token)
+    return profile_store.summaries()
+
+
+@router.get("/{request_id}", response_class=PlainTextResponse, summary="Get a request profile")
+async def get_profile(request_id: str, x_profile_token: Optional[str] = Header(None)):
+    """
+    Returns the collapsed stacks of a profiled request.
+
+    Feed the output to flamegraph.pl or load it in speedscope.
+    """
+    _require_token(x_profile_token)
+    profile = profile_store.get(request_id)
+    if not profile:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Profile for request {request_id} not found"
+        )
+    return PlainTextResponse(profile["collapsed"] + "\n")
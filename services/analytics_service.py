@@ -0,0 +1,156 @@
+"""
+SQL-side analytics over the expenses table
+"""
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import Session
+
+import models
+from data.loader import EXPENSE_FRAME_COLUMNS, normalize_expense_frame
+from metrics import ROWS_LOADED
+from services.rollup_service import rollup_category_totals
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+def expense_filters(
+    user_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None
+) -> List[Any]:
+    """Builds WHERE clauses for the common analytics filters"""
+    clauses = []
+    if category:
+        clauses.append(models.Expense.category == category)
+    if user_id:
+        clauses.append(models.Expense.user_id == user_id)
+    if start_date:
+        clauses.append(models.Expense.date >= start_date)
+    if end_date:
+        clauses.append(models.Expense.date <= end_date)
+    if type:
+        clauses.append(models.Expense.type == type)
+    return clauses
+
+
+def summarize_by_category(db: Session, **filters) -> Optional[Dict[str, Any]]:
+    """
+    Computes the per-category spending breakdown from the daily rollup.
+
+    Only one row per category is transferred from the database, so memory
+    stays proportional to the number of categories, not expenses.
+
+    Returns:
+        dict: Same shape as ExpenseML.analyze_spending, or None if no rows match
+    """
+    category_totals, _ = rollup_category_totals(db, **filters)
+    if not category_totals:
+        return None
+
+    return {
+        "category_breakdown": category_totals,
+        "total_spending": sum(category_totals.values()),
+        "highest_category": max(category_totals, key=category_totals.get)
+    }
+
+
+def count_expenses(db: Session, **filters) -> int:
+    """Counts the expenses matching the analytics filters"""
+    return db.scalar(
+        select(func.count()).select_from(models.Expense).where(*expense_filters(**filters))
+    )
+
+
+def load_expense_frame(
+    db: Session,
+    columns: Optional[List[str]] = None,
+    sample_every: int = 1,
+    **filters
+) -> "pd.DataFrame":
+    """
+    Reads expenses straight into a DataFrame for the ML modules.
+
+    Selects only the requested columns as plain row tuples, skipping ORM
+    hydration, to_dict() and per-row Pydantic models entirely.
+
+    Args:
+        db: Database session
+        columns: Column names to load (defaults to EXPENSE_FRAME_COLUMNS)
+        sample_every: Keep every n-th filtered row by id order (a
+            deterministic 1-in-N sample used when the full set exceeds the
+            memory budget)
+        **filters: user_id, start_date, end_date, type
+
+    Returns:
+        pd.DataFrame: One row per expense, ordered by id
+    """
+    import pandas as pd
+
+    columns = columns or EXPENSE_FRAME_COLUMNS
+    if sample_every > 1:
+        # Stride over the position within the filtered rows, not the global
+        # id, so the sample is spread over this user's / window's rows
+        ranked = (
+            select(
+                models.Expense.id.label("_sample_id"),
+                *(getattr(models.Expense, c) for c in columns),
+                func.row_number().over(order_by=models.Expense.id).label("_row_number")
+            )
+            .where(*expense_filters(**filters))
+            .subquery()
+        )
+        stmt = (
+            select(*(ranked.c[c] for c in columns))
+            .where((ranked.c._row_number - 1) % sample_every == 0)
+            .order_by(ranked.c._sample_id)
+        )
+    else:
+        stmt = (
+            select(*(getattr(models.Expense, c) for c in columns))
+            .where(*expense_filters(**filters))
+            .order_by(models.Expense.id)
+        )
+    rows = db.execute(stmt).all()
+    ROWS_LOADED.observe(len(rows), source="expenses")
+    return normalize_expense_frame(pd.DataFrame.from_records(rows, columns=columns))
+
+
+def iter_expense_frames(
+    db: Session,
+    chunk_size: int,
+    columns: Optional[List[str]] = None,
+    **filters
+) -> Iterator["pd.DataFrame"]:
+    """
+    Yields the filtered expenses as frames of at most chunk_size rows.
+
+    Pages by id (keyset), so only one chunk is held in memory at a time.
+    """
+    import pandas as pd
+
+    columns = columns or EXPENSE_FRAME_COLUMNS
+    select_columns = columns if "id" in columns else ["id"] + columns
+    last_id = None
+    while True:
+        stmt = (
+            select(*(getattr(models.Expense, c) for c in select_columns))
+            .where(*expense_filters(**filters))
+            .order_by(models.Expense.id)
+            .limit(chunk_size)
+        )
+        if last_id is not None:
+            stmt = stmt.where(models.Expense.id > last_id)
+        rows = db.execute(stmt).all()
+        if not rows:
+            return
+        ROWS_LOADED.observe(len(rows), source="expenses_chunk")
+        last_id = rows[-1][select_columns.index("id")]
+        frame = normalize_expense_frame(pd.DataFrame.from_records(rows, columns=select_columns))
+        yield frame[columns]
+        if len(rows) < chunk_size:
+            return
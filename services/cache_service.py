@@ -0,0 +1,48 @@
+"""
+Versioned result cache for the /ai endpoints
+
+Results are keyed by (endpoint, data version, params). The data version is
+a database counter bumped in the same transaction as every expense write,
+so a cached result is never served after the data it was computed from has
+changed, even across multiple workers.
+"""
+from typing import Hashable, Tuple
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+from cache import ResultCache, register_cache_metrics
+from config import settings
+from database import dialect_insert
+
+EXPENSES_COUNTER = "expenses"
+
+
+async def bump_data_version(db: AsyncSession, name: str = EXPENSES_COUNTER) -> None:
+    """Increments the change counter in the caller's transaction"""
+    table = models.ChangeCounter.__table__
+    stmt = dialect_insert(db.bind.dialect.name)(models.ChangeCounter).values(name=name, version=1)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["name"],
+        set_={"version": table.c.version + 1}
+    )
+    await db.execute(stmt)
+
+
+async def get_data_version(db: AsyncSession, name: str = EXPENSES_COUNTER) -> int:
+    """Reads the current change counter (0 if nothing was ever written)"""
+    version = await db.scalar(
+        select(models.ChangeCounter.version).where(models.ChangeCounter.name == name)
+    )
+    return version or 0
+
+
+def cache_key(endpoint: str, version: int, **params) -> Tuple[Hashable, ...]:
+    """Builds a cache key; params (including user_id) are order-independent"""
+    return (endpoint, version, tuple(sorted(params.items())))
+
+
+# Shared cache for the /ai endpoints
+result_cache = ResultCache(settings.RESULT_CACHE_SIZE, settings.RESULT_CACHE_TTL_SECONDS)
+register_cache_metrics("result", result_cache)
@@ -0,0 +1,262 @@
+"""
+Executor layer for CPU-bound work
+
+Keeps model inference and analyses off the event loop:
+
+- `threads`: a thread pool for scikit-learn / NumPy / pandas work, which
+  releases the GIL in its native kernels.
+- `processes`: a process pool for pure-Python heavy work (e.g. dateparser)
+  awaited by requests.
+- `jobs`: a separate process pool for the background analysis jobs, so a
+  burst of long analyses cannot queue ahead of request-path work.
+
+Each executor caps the number of in-flight tasks (running plus queued) and
+rejects work beyond it, so overload surfaces as a fast 503 instead of an
+ever-growing queue. Awaited tasks are bounded by EXECUTOR_TASK_TIMEOUT_SECONDS
+so a wedged worker cannot hold requests open forever. Queue depth and
+throughput counters are exposed via stats().
+
+Process executors can take a warm-up function that every worker runs once
+at start; start() launches all workers up front so /ready only reports
+200 after they are warm.
+
+Process workers are started with the "forkserver" method: the API process
+runs many threads (executor threads, aiosqlite, locks held by metrics and
+caches), and forking it directly could copy a lock held by another thread
+into the child, where it would never be released.
+"""
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+from config import settings
+from metrics import EXECUTOR_TASK_LATENCY, registry
+from ml.parser import ExpenseParser
+from profiling import bind_to_profile
+
+logger = logging.getLogger(__name__)
+
+
+class ExecutorSaturatedError(Exception):
+    """Raised when an executor already has max_pending tasks in flight"""
+
+
+class ExecutorTimeoutError(ExecutorSaturatedError):
+    """Raised when an awaited task does not finish within EXECUTOR_TASK_TIMEOUT_SECONDS"""
+
+
+def _init_process_worker(warm_up: Optional[Callable]) -> None:
+    # Workers must not share pooled connections with any other process
+    from database import engine
+    engine.dispose(close=False)
+    if warm_up is not None:
+        warm_up()
+
+
+class BoundedExecutor:
+    """A thread or process pool with an in-flight cap and queue-depth counters"""
+
+    def __init__(
+        self,
+        name: str,
+        kind: str,
+        max_workers: int,
+        max_pending: int,
+        warm_up: Optional[Callable] = None
+    ):
+        if kind not in ("thread", "process"):
+            raise ValueError(f"Unknown executor kind '{kind}'")
+        self.name = name
+        self.kind = kind
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        # Run once in each process worker; must be picklable (module-level)
+        self.warm_up = warm_up
+        self.started = kind == "thread"
+        self.start_error: Optional[str] = None
+        self._executor: Optional[Executor] = None
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    def _get_executor(self) -> Executor:
+        # Created on first use so importing the API does not start workers
+        if self._executor is None:
+            if self.kind == "thread":
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=f"{self.name}-worker"
+                )
+            else:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("forkserver"),
+                    initializer=_init_process_worker,
+                    initargs=(self.warm_up,)
+                )
+        return self._executor
+
+    def submit(self, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Submits fn to the pool.
+
+        Process pool tasks must be picklable (module-level functions).
+
+        Raises:
+            ExecutorSaturatedError: If max_pending tasks are already in flight
+        """
+        with self._lock:
+            if self.in_flight >= self.max_pending:
+                self.rejected += 1
+                raise ExecutorSaturatedError(
+                    f"{self.name} executor is busy ({self.in_flight} tasks in flight)"
+                )
+            try:
+                future = self._get_executor().submit(fn, *args, **kwargs)
+            except BrokenProcessPool:
+                # A worker died (e.g. killed for memory); start a fresh pool
+                self._executor = None
+                future = self._get_executor().submit(fn, *args, **kwargs)
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        future.add_done_callback(functools.partial(self._task_done, time.perf_counter()))
+        return future
+
+    def _task_done(self, submitted_at: float, future: Future) -> None:
+        EXECUTOR_TASK_LATENCY.observe(time.perf_counter() - submitted_at, executor=self.name)
+        with self._lock:
+            self.in_flight -= 1
+            if future.cancelled() or future.exception() is not None:
+                self.failed += 1
+            else:
+                self.completed += 1
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Runs fn in the pool and awaits its result without blocking the event loop.
+
+        Raises:
+            ExecutorSaturatedError: If max_pending tasks are already in flight
+            ExecutorTimeoutError: If the task does not finish within
+                EXECUTOR_TASK_TIMEOUT_SECONDS (a task that already started
+                keeps its worker until it returns)
+        """
+        task = functools.partial(fn, *args, **kwargs)
+        if self.kind == "thread":
+            # Lets a request profile sample the worker thread running its task
+            task = bind_to_profile(task)
+        future = self.submit(task)
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), settings.EXECUTOR_TASK_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            raise ExecutorTimeoutError(
+                f"{self.name} task did not finish within {settings.EXECUTOR_TASK_TIMEOUT_SECONDS}s"
+            )
+
+    async def start(self) -> None:
+        """
+        Starts every process worker and waits until each has run warm_up.
+
+        Workers are otherwise spawned on demand, so the first requests would
+        pay for interpreter start-up and warm-up. Errors are recorded in
+        start_error rather than raised.
+        """
+        if self.started:
+            return
+        try:
+            pids = set()
+            while len(pids) < self.max_workers:
+                # A warm worker may answer every ping while another is still
+                # starting, so keep pinging until all of them have answered
+                pids.update(await asyncio.gather(*(self.run(os.getpid) for _ in range(self.max_workers))))
+                if len(pids) < self.max_workers:
+                    await asyncio.sleep(0.05)
+            self.start_error = None
+        except Exception as e:
+            logger.exception("%s executor failed to start", self.name)
+            self.start_error = str(e) or type(e).__name__
+        finally:
+            self.started = True
+
+    def is_ready(self) -> bool:
+        """True once start() brought every worker up (always for thread pools)"""
+        return self.started and self.start_error is None
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "kind": self.kind,
+                "ready": self.is_ready(),
+                "max_workers": self.max_workers,
+                "max_pending": self.max_pending,
+                "in_flight": self.in_flight,
+                "queue_depth": max(0, self.in_flight - self.max_workers),
+                "peak_in_flight": self.peak_in_flight,
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected,
+            }
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+# Shared executors
+threads = BoundedExecutor(
+    "threads", "thread",
+    settings.EXECUTOR_THREAD_WORKERS,
+    settings.EXECUTOR_THREAD_MAX_PENDING
+)
+processes = BoundedExecutor(
+    "processes", "process",
+    settings.EXECUTOR_PROCESS_WORKERS,
+    settings.EXECUTOR_PROCESS_MAX_PENDING,
+    warm_up=ExpenseParser.warm_up
+)
+jobs = BoundedExecutor(
+    "jobs", "process",
+    settings.AI_JOB_WORKERS,
+    settings.AI_JOB_MAX_QUEUED
+)
+
+
+def executor_stats() -> Dict[str, Dict[str, Any]]:
+    """Queue depth and counters for every shared executor"""
+    return {executor.name: executor.stats() for executor in (threads, processes, jobs)}
+
+
+def _collect_executor_metrics():
+    stats = executor_stats()
+    for field, metric_type, documentation in (
+        ("in_flight", "gauge", "Tasks running or queued"),
+        ("queue_depth", "gauge", "Tasks waiting for a free worker"),
+        ("max_workers", "gauge", "Configured worker count"),
+        ("completed", "counter", "Tasks finished successfully"),
+        ("failed", "counter", "Tasks that raised"),
+        ("rejected", "counter", "Tasks rejected because the executor was saturated"),
+    ):
+        suffix = "_total" if metric_type == "counter" else ""
+        yield (
+            f"executor_{field}{suffix}", metric_type, documentation,
+            [({"executor": name}, executor[field]) for name, executor in stats.items()]
+        )
+
+
+registry.register_collector(_collect_executor_metrics)
+
+
+def shutdown_executors() -> None:
+    for executor in (threads, processes, jobs):
+        executor.shutdown()
@@ -0,0 +1,73 @@
+"""
+Streaming expense export (CSV / NDJSON)
+"""
+import csv
+import io
+import json
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+import models
+from config import settings
+from database import AsyncSessionLocal
+from services.analytics_service import expense_filters
+
+EXPORT_COLUMNS = [
+    "id", "user_id", "description", "amount", "category",
+    "date", "type", "created_at", "updated_at"
+]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _cell(value):
+    """Renders dates/datetimes as ISO strings and leaves other values as-is"""
+    return value.isoformat() if hasattr(value, "isoformat") else value
+
+
+def _format_csv(rows, header: bool = False) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow([_cell(v) for v in row])
+    return buffer.getvalue()
+
+
+def _format_ndjson(rows) -> str:
+    return "".join(
+        json.dumps({k: _cell(v) for k, v in zip(EXPORT_COLUMNS, row)}) + "\n"
+        for row in rows
+    )
+
+
+async def stream_expenses(format: str, **filters) -> AsyncIterator[str]:
+    """
+    Yields the matching expenses as CSV or NDJSON text chunks.
+
+    Rows are fetched through a server-side cursor in partitions of
+    EXPORT_CHUNK_SIZE, so memory stays flat regardless of history size.
+    The generator owns its session because it outlives the request handler.
+
+    Args:
+        format: "csv" or "ndjson"
+        **filters: user_id, start_date, end_date, type, category
+    """
+    stmt = (
+        select(*(getattr(models.Expense, c) for c in EXPORT_COLUMNS))
+        .where(*expense_filters(**filters))
+        .order_by(models.Expense.id)
+        .execution_options(yield_per=settings.EXPORT_CHUNK_SIZE)
+    )
+
+    async with AsyncSessionLocal() as db:
+        result = await db.stream(stmt)
+        if format == "csv":
+            yield _format_csv([], header=True)
+        async for partition in result.partitions():
+            yield _format_csv(partition) if format == "csv" else _format_ndjson(partition)
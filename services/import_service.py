@@ -0,0 +1,163 @@
+"""
+Chunked CSV import into the expenses table
+
+Streams a CSV of any size in fixed-size chunks: each chunk is normalized
+with the preprocessing pipeline helpers, categorized in one batched model
+call and bulk-inserted, so memory is bounded by the chunk size.
+
+Usage:
+    python -m services.import_service data/raw_expenses.csv [--chunk-size 5000] [--user-id 1]
+"""
+import argparse
+import asyncio
+from typing import TYPE_CHECKING, Any, BinaryIO, Callable, Dict, List, Optional, Tuple, Union
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from ml.preprocessing import clean_descriptions, normalize_dates
+from services.executors import threads
+from services.ingest_service import prepare_expense_rows, insert_expense_rows
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+IMPORT_COLUMNS = ["description", "amount", "category", "date", "type", "user_id"]
+
+# Only the first errors are kept so a broken file cannot grow the report without bound
+MAX_REPORTED_ERRORS = 100
+
+
+def normalize_chunk(
+    chunk: "pd.DataFrame",
+    default_user_id: Optional[int] = None
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    """
+    Turns a raw CSV chunk into ExpenseCreate-shaped records.
+
+    Returns:
+        tuple: (records, cleaned descriptions used for category prediction)
+    """
+    chunk = chunk.rename(columns=lambda c: str(c).strip().lower())
+    for column in IMPORT_COLUMNS:
+        if column not in chunk.columns:
+            chunk[column] = None
+    chunk = chunk[IMPORT_COLUMNS]
+
+    cleaned = clean_descriptions(chunk["description"])
+    chunk = chunk.assign(
+        description=chunk["description"].map(lambda d: " ".join(d.split()) if isinstance(d, str) else d),
+        date=normalize_dates(chunk["date"]),
+        type=chunk["type"].fillna("expense")
+    )
+    if default_user_id is not None:
+        chunk = chunk.assign(user_id=chunk["user_id"].fillna(default_user_id))
+
+    # Missing cells become None so optional fields validate as "not provided"
+    chunk = chunk.astype(object).where(chunk.notna(), None)
+    return chunk.to_dict("records"), cleaned.tolist()
+
+
+def prepare_chunk(
+    chunk: "pd.DataFrame",
+    default_user_id: Optional[int] = None,
+    start_index: int = 0
+) -> Tuple[int, List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Normalizes, validates and categorizes one raw CSV chunk.
+
+    All of it is blocking pandas / scikit-learn work, so import_csv runs it
+    in an executor thread as a single task.
+
+    Returns:
+        tuple: (rows in the chunk, insertable rows, per-row errors)
+    """
+    records, cleaned = normalize_chunk(chunk, default_user_id)
+    rows, errors = prepare_expense_rows(records, start_index=start_index, prediction_texts=cleaned)
+    return len(records), rows, errors
+
+
+async def import_csv(
+    db: AsyncSession,
+    source: Union[str, BinaryIO],
+    chunk_size: int = settings.IMPORT_CHUNK_SIZE,
+    default_user_id: Optional[int] = None,
+    on_progress: Optional[Callable[[Dict[str, Any]], None]] = None
+) -> Dict[str, Any]:
+    """
+    Imports a CSV file chunk by chunk, committing after each chunk.
+
+    Args:
+        db: Async database session
+        source: Path or binary file object of the CSV
+        chunk_size: Rows parsed, categorized and inserted per chunk
+        default_user_id: user_id applied to rows without one
+        on_progress: Called with the running counters after every chunk
+
+    Returns:
+        dict: processed/created/failed counters, chunk count and the first errors
+    """
+    progress = {"processed": 0, "created": 0, "failed": 0, "chunks": 0}
+    errors: List[Dict[str, Any]] = []
+
+    import pandas as pd
+
+    reader = pd.read_csv(source, chunksize=chunk_size, dtype=str, skipinitialspace=True)
+    try:
+        while True:
+            # Parsing is blocking; keep it off the event loop
+            chunk = await asyncio.to_thread(next, reader, None)
+            if chunk is None:
+                break
+
+            processed, rows, chunk_errors = await threads.run(
+                prepare_chunk, chunk, default_user_id, progress["processed"]
+            )
+            await insert_expense_rows(db, rows)
+            await db.commit()
+
+            progress["processed"] += processed
+            progress["created"] += len(rows)
+            progress["failed"] += len(chunk_errors)
+            progress["chunks"] += 1
+            errors.extend(chunk_errors[:MAX_REPORTED_ERRORS - len(errors)])
+
+            if on_progress:
+                on_progress(dict(progress))
+    finally:
+        reader.close()
+
+    return {**progress, "errors": errors}
+
+
+async def _run_cli(path: str, chunk_size: int, user_id: Optional[int]) -> Dict[str, Any]:
+    from database import AsyncSessionLocal, engine
+    import models
+
+    models.Base.metadata.create_all(bind=engine)
+
+    def report(p):
+        print(f"  chunk {p['chunks']}: {p['processed']} rows processed, "
+              f"{p['created']} created, {p['failed']} failed")
+
+    async with AsyncSessionLocal() as db:
+        return await import_csv(db, path, chunk_size, user_id, on_progress=report)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import expenses from a CSV file")
+    parser.add_argument("path", help="CSV file with description, amount, date and optional category/type/user_id columns")
+    parser.add_argument("--chunk-size", type=int, default=settings.IMPORT_CHUNK_SIZE)
+    parser.add_argument("--user-id", type=int, default=None, help="user_id for rows that have none")
+    args = parser.parse_args()
+
+    print(f"Importing {args.path}...")
+    summary = asyncio.run(_run_cli(args.path, args.chunk_size, args.user_id))
+    print(f"Import complete: {summary['created']} created, {summary['failed']} failed "
+          f"out of {summary['processed']} rows")
+    for err in summary["errors"][:10]:
+        print(f"  row {err['index']}: {err['error']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Bulk ingestion helpers shared by the bulk API and file imports
+"""
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+import models
+from data.schemas import ExpenseCreate
+from ml.predictor import ExpenseML
+from services.cache_service import bump_data_version
+from services.rollup_service import apply_rollup_deltas, collect_deltas
+
+
+def _format_validation_error(exc: ValidationError) -> str:
+    """Flatten a pydantic ValidationError into a single readable line"""
+    parts = []
+    for err in exc.errors():
+        loc = ".".join(str(p) for p in err.get("loc", ())) or "row"
+        parts.append(f"{loc}: {err.get('msg')}")
+    return "; ".join(parts)
+
+
+def prepare_expense_rows(
+    records: List[Dict[str, Any]],
+    start_index: int = 0,
+    prediction_texts: Optional[List[str]] = None
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Validates raw expense records and fills in missing categories.
+
+    Invalid rows are reported instead of raising, so one bad row never
+    aborts the batch. Categories for all rows that lack one are predicted
+    in a single batched model call.
+
+    Args:
+        records: Raw expense payloads (same shape as ExpenseCreate)
+        start_index: Offset added to reported row indexes (for chunked input)
+        prediction_texts: Pre-cleaned descriptions aligned with records, used
+            for category prediction instead of the raw descriptions
+
+    Returns:
+        tuple: (rows ready for an executemany insert, per-row errors)
+    """
+    rows: List[Dict[str, Any]] = []
+    texts: List[str] = []
+    errors: List[Dict[str, Any]] = []
+
+    for i, record in enumerate(records):
+        try:
+            expense = ExpenseCreate.model_validate(record)
+        except ValidationError as e:
+            errors.append({"index": start_index + i, "error": _format_validation_error(e)})
+            continue
+        rows.append(expense.model_dump())
+        texts.append(prediction_texts[i] if prediction_texts is not None else expense.description)
+
+    missing = [i for i, row in enumerate(rows) if not row["category"]]
+    if missing:
+        predictions = ExpenseML.predict_categories([texts[i] for i in missing])
+        for i, prediction in zip(missing, predictions):
+            rows[i]["category"] = str(prediction.get("category", "Other"))
+
+    return rows, errors
+
+
+async def insert_expense_rows(db: AsyncSession, rows: List[Dict[str, Any]]) -> None:
+    """
+    Inserts prepared rows with a single executemany statement, folds them
+    into the rollup tables and bumps the data version.
+
+    The caller owns the transaction and is responsible for commit/rollback.
+    """
+    if rows:
+        await db.execute(insert(models.Expense), rows)
+        await apply_rollup_deltas(db, collect_deltas(rows))
+        await bump_data_version(db)
@@ -0,0 +1,193 @@
+"""
+Background ML analysis jobs
+
+Anomaly detection, forecasting and insights can be submitted as jobs that
+run in their own process pool (services.executors.jobs), so a large
+user's analysis never holds a request (or its database connection) open
+and long analyses never queue ahead of request-path work.
+Jobs are kept in memory by the API process that accepted them; workers
+open their own synchronous sessions and load the data themselves.
+"""
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from datetime import datetime, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from config import settings
+from services.executors import BoundedExecutor, ExecutorSaturatedError, jobs
+
+JOB_KINDS = ("anomalies", "forecast", "insights")
+
+
+class JobQueueFullError(Exception):
+    """Raised when the number of unfinished jobs reaches AI_JOB_MAX_QUEUED"""
+
+
+class AnalysisFailedError(Exception):
+    """Raised by run_analysis when the analysis raises; carries its worker timestamps"""
+
+    def __init__(self, message: str, worker: Dict[str, float]):
+        # Both go in args so the error survives pickling back from the worker
+        super().__init__(message, worker)
+        self.worker = worker
+
+    def __str__(self) -> str:
+        return self.args[0]
+
+
+def run_analysis(kind: str, params: Dict[str, Any]) -> Tuple[Any, Dict[str, float]]:
+    """
+    Runs one analysis in a worker process.
+
+    Returns:
+        tuple: (analysis result, {"started_at", "finished_at"} epoch seconds)
+
+    Raises:
+        AnalysisFailedError: If the analysis raises
+    """
+    from services import ml_service
+
+    analyses = {
+        "anomalies": ml_service.detect_anomalies,
+        "forecast": ml_service.forecast_spending,
+        "insights": ml_service.generate_insights,
+    }
+    started_at = time.time()
+    try:
+        result = ml_service.with_session(analyses[kind], **params)
+    except Exception as e:
+        raise AnalysisFailedError(
+            str(e) or type(e).__name__,
+            {"started_at": started_at, "finished_at": time.time()}
+        ) from None
+    return result, {"started_at": started_at, "finished_at": time.time()}
+
+
+def _timestamp(epoch: Optional[float]) -> Optional[str]:
+    if epoch is None:
+        return None
+    return datetime.fromtimestamp(epoch, tz=timezone.utc).isoformat()
+
+
+class Job:
+    """A submitted analysis and its future"""
+
+    def __init__(self, kind: str, params: Dict[str, Any], future: Future, submitted_at: float):
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.future = future
+        self.submitted_at = submitted_at
+        self.completed_at: Optional[float] = None
+
+    @property
+    def status(self) -> str:
+        if self.future.done():
+            return "failed" if self.future.exception() else "succeeded"
+        return "running" if self.future.running() else "queued"
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Status, timing and (once finished) the result or error"""
+        status = self.status
+        # The done callback may not have run yet right after completion
+        completed_at = self.completed_at or time.time()
+        job = {
+            "id": self.id,
+            "kind": self.kind,
+            "params": self.params,
+            "status": status,
+            "submitted_at": _timestamp(self.submitted_at),
+            "started_at": None,
+            "finished_at": None,
+            "timings": {},
+            "result": None,
+            "error": None,
+        }
+        if status in ("queued", "running"):
+            return job
+
+        worker = None
+        if status == "failed":
+            error = self.future.exception()
+            job["error"] = str(error) or type(error).__name__
+            # Missing if the worker never ran it (e.g. the pool broke)
+            worker = getattr(error, "worker", None)
+        else:
+            job["result"], worker = self.future.result()
+        if worker is None:
+            job["finished_at"] = _timestamp(completed_at)
+            return job
+
+        job["started_at"] = _timestamp(worker["started_at"])
+        job["finished_at"] = _timestamp(worker["finished_at"])
+        job["timings"] = {
+            "queued_ms": round((worker["started_at"] - self.submitted_at) * 1000, 3),
+            "run_ms": round((worker["finished_at"] - worker["started_at"]) * 1000, 3),
+            "total_ms": round((completed_at - self.submitted_at) * 1000, 3),
+        }
+        return job
+
+
+class JobManager:
+    """Submits analyses to an executor and tracks their status"""
+
+    def __init__(self, executor: BoundedExecutor, max_queued: int, history_size: int):
+        self.executor = executor
+        self.max_queued = max_queued
+        self.history_size = history_size
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _pending(self) -> int:
+        return sum(1 for job in self._jobs.values() if not job.future.done())
+
+    def pending(self) -> int:
+        """Number of queued or running jobs"""
+        with self._lock:
+            return self._pending()
+
+    def submit(self, kind: str, params: Dict[str, Any]) -> Job:
+        """
+        Queues an analysis job.
+
+        Raises:
+            ValueError: If kind is not one of JOB_KINDS
+            JobQueueFullError: If AI_JOB_MAX_QUEUED jobs are already unfinished
+                or the executor is saturated
+        """
+        if kind not in JOB_KINDS:
+            raise ValueError(f"Unknown job kind '{kind}'")
+        with self._lock:
+            if self._pending() >= self.max_queued:
+                raise JobQueueFullError(f"Too many pending jobs (limit {self.max_queued})")
+            submitted_at = time.time()
+            try:
+                future = self.executor.submit(run_analysis, kind, params)
+            except ExecutorSaturatedError as e:
+                raise JobQueueFullError(str(e))
+            job = Job(kind, params, future, submitted_at)
+            self._jobs[job.id] = job
+            self._trim()
+        future.add_done_callback(lambda _: setattr(job, "completed_at", time.time()))
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def _trim(self) -> None:
+        # Forget the oldest finished jobs beyond the history size
+        finished = [job_id for job_id, job in self._jobs.items() if job.future.done()]
+        for job_id in finished[:max(0, len(self._jobs) - self.history_size)]:
+            del self._jobs[job_id]
+
+
+# Shared job manager for the /ai/jobs endpoints
+job_manager = JobManager(
+    jobs,
+    settings.AI_JOB_MAX_QUEUED,
+    settings.AI_JOB_HISTORY_SIZE
+)
@@ -0,0 +1,155 @@
+"""
+ML analyses over the expenses table
+
+Each analysis loads only the rows (or rollups) for the requested user /
+date window and runs the matching model. They take a synchronous Session
+so the same code runs in executor threads (API routes) and worker
+processes (background jobs) through with_session().
+
+Raw rows are held in memory up to MAX_EXPENSES_IN_MEMORY. Beyond that the
+anomaly model is fitted on a deterministic sample and scores the full set
+chunk by chunk, so memory stays bounded by the budget instead of the
+user's history. Peak memory of a MEMORY_TRACKING_SAMPLE_RATE fraction of
+analyses is recorded by metrics.track_memory.
+
+The ml.* model modules (and scikit-learn with them) are imported inside
+each analysis, so importing the API does not pay for them; the first
+analysis imports them in its executor thread or worker process.
+"""
+import logging
+import math
+from typing import TYPE_CHECKING, Any, Callable, Dict, List
+
+from sqlalchemy.orm import Session
+
+from config import settings
+from metrics import SAMPLED_ANALYSES, track_memory
+from services.analytics_service import count_expenses, iter_expense_frames, load_expense_frame
+from services.rollup_service import rollup_category_totals, rollup_daily_totals
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+
+def _over_budget(analysis: str, expense_count: int) -> bool:
+    if expense_count <= settings.MAX_EXPENSES_IN_MEMORY:
+        return False
+    SAMPLED_ANALYSES.inc(analysis=analysis)
+    logger.warning(
+        "%s: %d expenses exceed MAX_EXPENSES_IN_MEMORY=%d, using sampled mode",
+        analysis, expense_count, settings.MAX_EXPENSES_IN_MEMORY
+    )
+    return True
+
+
+def _sample_frame(db: Session, expense_count: int, **filters) -> "pd.DataFrame":
+    # Every n-th filtered row keeps at most MAX_EXPENSES_IN_MEMORY rows
+    sample_every = math.ceil(expense_count / settings.MAX_EXPENSES_IN_MEMORY)
+    return load_expense_frame(db, sample_every=sample_every, **filters)
+
+
+def _detect_anomalies_chunked(db: Session, sample: "pd.DataFrame", **filters) -> List[Dict[str, Any]]:
+    """Fits on the sample, then scores every expense one budget-sized chunk at a time"""
+    from ml.anomaly_detector import AnomalyDetector
+
+    if sample.empty:
+        # Rows deleted since they were counted; nothing to fit on
+        return []
+    preprocessor, model = AnomalyDetector.fit_ml_model(sample)
+    anomalies = []
+    for chunk in iter_expense_frames(db, settings.MAX_EXPENSES_IN_MEMORY, **filters):
+        anomalies.extend(AnomalyDetector.score_ml_anomalies(chunk, preprocessor, model))
+    return anomalies
+
+
+def detect_anomalies(db: Session, **filters) -> Any:
+    """
+    Runs Isolation Forest anomaly detection over the filtered expenses.
+
+    Returns:
+        list: Detected anomalies, or a message dict if there is too little data
+    """
+    from ml.anomaly_detector import AnomalyDetector
+
+    with track_memory("anomalies", settings.MEMORY_TRACKING_SAMPLE_RATE):
+        expense_count = count_expenses(db, **filters)
+        if expense_count < 10:
+            return {
+                "message": "Need at least 10 expenses for anomaly detection",
+                "anomalies": []
+            }
+        if _over_budget("anomalies", expense_count):
+            sample = _sample_frame(db, expense_count, **filters)
+            return _detect_anomalies_chunked(db, sample, **filters)
+
+        expenses = load_expense_frame(db, **filters)
+        return AnomalyDetector.detect_ml_anomalies(expenses)
+
+
+def forecast_spending(db: Session, days: int = settings.DEFAULT_FORECAST_DAYS, **filters) -> Dict[str, Any]:
+    """
+    Forecasts daily spending from the pre-aggregated daily rollup.
+
+    Returns:
+        dict: Forecast data, or a message dict if there is too little data
+    """
+    from ml.forecaster import ExpenseForecaster
+
+    with track_memory("forecast", settings.MEMORY_TRACKING_SAMPLE_RATE):
+        # One row per day instead of per expense
+        daily_spend, expense_count = rollup_daily_totals(db, **filters)
+        if expense_count < 10:
+            return {
+                "message": "Need at least 10 expenses for forecasting",
+                "forecast": []
+            }
+        return ExpenseForecaster.forecast_daily(daily_spend, days)
+
+
+def generate_insights(db: Session, **filters) -> Any:
+    """
+    Builds prioritized insights for the filtered expenses.
+
+    Totals and the forecast series come from the rollups; raw rows are only
+    loaded for anomaly detection.
+
+    Returns:
+        list: Insights, or a message dict if there are no expenses
+    """
+    from ml.insights import InsightEngine
+
+    with track_memory("insights", settings.MEMORY_TRACKING_SAMPLE_RATE):
+        category_totals, expense_count = rollup_category_totals(db, **filters)
+        if expense_count == 0:
+            return {
+                "message": "No expenses to analyze for insights",
+                "insights": []
+            }
+        daily_spend, _ = rollup_daily_totals(db, **filters)
+
+        if _over_budget("insights", expense_count):
+            expenses = _sample_frame(db, expense_count, **filters)
+            return InsightEngine.generate_insights(
+                expenses,
+                category_totals=category_totals,
+                daily_spend=daily_spend,
+                anomalies=_detect_anomalies_chunked(db, expenses, **filters),
+                transaction_count=expense_count
+            )
+
+        expenses = load_expense_frame(db, **filters)
+        return InsightEngine.generate_insights(
+            expenses,
+            category_totals=category_totals,
+            daily_spend=daily_spend
+        )
+
+
+def with_session(fn: Callable, *args, **kwargs) -> Any:
+    """Calls fn(db, *args, **kwargs) with a fresh synchronous session"""
+    from database import SessionLocal
+
+    with SessionLocal() as db:
+        return fn(db, *args, **kwargs)
@@ -0,0 +1,236 @@
+"""
+Daily and monthly expense rollups
+
+Rollup rows are adjusted by deltas inside the same transaction as every
+expense create/update/delete, so analytics can read a few hundred
+pre-aggregated rows instead of scanning raw expenses.
+
+Usage:
+    python -m services.rollup_service rebuild
+"""
+import argparse
+from collections import defaultdict
+from datetime import date
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+import models
+from database import dialect_insert
+from metrics import ROWS_LOADED
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# (user_id, day, category, type) -> [total, count]
+RollupDeltas = Dict[Tuple[int, date, str, str], List[float]]
+
+
+def collect_deltas(rows: Iterable[Dict[str, Any]], sign: int = 1, deltas: Optional[RollupDeltas] = None) -> RollupDeltas:
+    """
+    Accumulates rollup deltas for expense rows.
+
+    Args:
+        rows: Dicts with user_id, date, category, type and amount
+        sign: 1 for inserted rows, -1 for removed rows
+        deltas: Existing deltas to add to (for updates: old row -1, new row +1)
+    """
+    deltas = deltas if deltas is not None else defaultdict(lambda: [0.0, 0])
+    for row in rows:
+        key = (row.get("user_id") or 0, row["date"], row["category"], row.get("type") or "expense")
+        deltas[key][0] += sign * row["amount"]
+        deltas[key][1] += sign
+    return deltas
+
+
+def expense_snapshot(expense: models.Expense) -> Dict[str, Any]:
+    """Captures the rollup-relevant fields of an ORM expense"""
+    return {
+        "user_id": expense.user_id,
+        "date": expense.date,
+        "category": expense.category,
+        "type": expense.type,
+        "amount": expense.amount,
+    }
+
+
+def _upsert(dialect_name: str, model):
+    """Builds an INSERT ... ON CONFLICT that adds to the existing totals"""
+    stmt = dialect_insert(dialect_name)(model)
+    table = model.__table__
+    return stmt.on_conflict_do_update(
+        index_elements=[c.name for c in table.primary_key.columns],
+        set_={
+            "total": table.c.total + stmt.excluded.total,
+            "count": table.c.count + stmt.excluded.count,
+        }
+    )
+
+
+async def apply_rollup_deltas(db: AsyncSession, deltas: RollupDeltas) -> None:
+    """
+    Applies deltas to the daily and monthly rollups in the caller's transaction.
+    Buckets that drop to zero expenses are removed.
+    """
+    deltas = {k: v for k, v in deltas.items() if v[1] != 0 or v[0] != 0}
+    if not deltas:
+        return
+
+    monthly: RollupDeltas = defaultdict(lambda: [0.0, 0])
+    for (user_id, day, category, type_), (total, count) in deltas.items():
+        bucket = monthly[(user_id, day.replace(day=1), category, type_)]
+        bucket[0] += total
+        bucket[1] += count
+
+    dialect_name = db.bind.dialect.name
+    await db.execute(_upsert(dialect_name, models.DailyRollup), [
+        {"user_id": u, "day": d, "category": c, "type": t, "total": total, "count": count}
+        for (u, d, c, t), (total, count) in deltas.items()
+    ])
+    await db.execute(_upsert(dialect_name, models.MonthlyRollup), [
+        {"user_id": u, "month": m, "category": c, "type": t, "total": total, "count": count}
+        for (u, m, c, t), (total, count) in monthly.items()
+    ])
+
+    if any(count < 0 for _, count in deltas.values()):
+        await db.execute(delete(models.DailyRollup).where(models.DailyRollup.count <= 0))
+        await db.execute(delete(models.MonthlyRollup).where(models.MonthlyRollup.count <= 0))
+
+
+def rollup_filters(
+    user_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    type: Optional[str] = None,
+    category: Optional[str] = None
+) -> List[Any]:
+    """Builds WHERE clauses on the daily rollup mirroring expense_filters"""
+    table = models.DailyRollup
+    clauses = []
+    if user_id:
+        clauses.append(table.user_id == user_id)
+    if start_date:
+        clauses.append(table.day >= start_date)
+    if end_date:
+        clauses.append(table.day <= end_date)
+    if type:
+        clauses.append(table.type == type)
+    if category:
+        clauses.append(table.category == category)
+    return clauses
+
+
+def rollup_category_totals(db: Session, **filters) -> Tuple[Dict[str, float], int]:
+    """
+    Reads per-category totals from the daily rollup.
+
+    Returns:
+        tuple: ({category: total}, number of expenses)
+    """
+    table = models.DailyRollup
+    stmt = (
+        select(table.category, func.sum(table.total), func.sum(table.count))
+        .where(*rollup_filters(**filters))
+        .group_by(table.category)
+    )
+    totals, count = {}, 0
+    for category, total, n in db.execute(stmt):
+        totals[category] = float(total)
+        count += int(n)
+    ROWS_LOADED.observe(len(totals), source="rollup_category")
+    return totals, count
+
+
+def rollup_daily_totals(db: Session, **filters) -> Tuple["pd.DataFrame", int]:
+    """
+    Reads the daily spending series (summed over categories) from the rollup.
+
+    Returns:
+        tuple: (DataFrame with date (datetime64) and amount columns,
+        number of underlying expenses)
+    """
+    table = models.DailyRollup
+    stmt = (
+        select(table.day, func.sum(table.total), func.sum(table.count))
+        .where(*rollup_filters(**filters))
+        .group_by(table.day)
+        .order_by(table.day)
+    )
+    import pandas as pd
+
+    rows = db.execute(stmt).all()
+    ROWS_LOADED.observe(len(rows), source="rollup_daily")
+    daily = pd.DataFrame.from_records(rows, columns=["date", "amount", "count"])
+    daily["date"] = pd.to_datetime(daily["date"])
+    return daily[["date", "amount"]], int(daily["count"].sum())
+
+
+def _month_start(db: Session, column):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.date_trunc("month", column)
+    return func.strftime("%Y-%m-01", column)
+
+
+def rebuild_rollups(db: Session) -> Dict[str, int]:
+    """
+    Recomputes both rollup tables from the raw expenses.
+
+    Returns:
+        dict: Number of daily and monthly rollup rows written
+    """
+    expense = models.Expense
+    daily, monthly = models.DailyRollup, models.MonthlyRollup
+
+    db.execute(delete(daily))
+    db.execute(delete(monthly))
+
+    user_key = func.coalesce(expense.user_id, 0)
+    db.execute(insert(daily).from_select(
+        ["user_id", "day", "category", "type", "total", "count"],
+        select(user_key, expense.date, expense.category, expense.type,
+               func.sum(expense.amount), func.count())
+        .group_by(user_key, expense.date, expense.category, expense.type)
+    ))
+
+    month = _month_start(db, daily.day)
+    db.execute(insert(monthly).from_select(
+        ["user_id", "month", "category", "type", "total", "count"],
+        select(daily.user_id, month, daily.category, daily.type,
+               func.sum(daily.total), func.sum(daily.count))
+        .group_by(daily.user_id, month, daily.category, daily.type)
+    ))
+    db.commit()
+
+    return {
+        "daily": db.scalar(select(func.count()).select_from(daily)),
+        "monthly": db.scalar(select(func.count()).select_from(monthly)),
+    }
+
+
+def ensure_rollups(db: Session) -> Optional[Dict[str, int]]:
+    """Rebuilds the rollups if they are empty while expenses exist (e.g. after upgrading)"""
+    has_rollups = db.scalar(select(models.DailyRollup.day).limit(1)) is not None
+    has_expenses = db.scalar(select(models.Expense.id).limit(1)) is not None
+    if has_expenses and not has_rollups:
+        return rebuild_rollups(db)
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the expense rollup tables")
+    parser.add_argument("command", choices=["rebuild"])
+    parser.parse_args()
+
+    from database import SessionLocal, engine
+    models.Base.metadata.create_all(bind=engine)
+
+    print("Rebuilding expense rollups...")
+    with SessionLocal() as db:
+        counts = rebuild_rollups(db)
+    print(f"Rollups rebuilt: {counts['daily']} daily rows, {counts['monthly']} monthly rows")
+
+
+if __name__ == "__main__":
+    main()
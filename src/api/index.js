@@ -48,6 +48,15 @@ export const api = {
         return handleResponse(resp);
     },
 
+    createExpensesBulk: async (expenses) => {
+        const resp = await fetch(`${API_BASE_URL}/expenses/bulk`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify(expenses)
+        });
+        return handleResponse(resp);
+    },
+
     updateExpense: async (id, expense) => {
         const resp = await fetch(`${API_BASE_URL}/expenses/${id}`, {
             method: 'PUT',
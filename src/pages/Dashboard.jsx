@@ -462,25 +462,26 @@ export default function Dashboard({ auth, onLogout }) {
             const data = XLSX.utils.sheet_to_json(ws);
 
             try {
-                const results = await Promise.all(data.map(row => {
-                    const amount = parseFloat(row.Amount || row.amount || 0);
-                    if (amount <= 0) return null;
-
-                    return api.createExpense({
+                const rows = data
+                    .map(row => ({
                         description: row.Description || row.description || row.Title || row.title || 'Imported',
-                        amount: amount,
-                        category: row.Category || row.category || 'Other',
+                        amount: parseFloat(row.Amount || row.amount || 0),
+                        // Leave category empty so the backend predicts it in one batch
+                        category: row.Category || row.category || null,
                         date: row.Date || row.date || new Date().toISOString().split('T')[0],
                         type: 'expense',
                         user_id: currentUser.id
-                    });
-                }));
+                    }))
+                    .filter(row => row.amount > 0);
 
-                const newEntries = results.filter(res => res !== null);
-                setExpenses(prev => [...newEntries, ...prev]);
-                setExpenses(prev => [...newEntries, ...prev]);
+                const result = await api.createExpensesBulk(rows);
+                const refreshed = await api.getExpenses();
+                setExpenses(refreshed || []);
                 setIsAddModalOpen(false);
-                addNotification('success', 'Import Success', `Successfully imported ${newEntries.length} transactions.`);
+                addNotification('success', 'Import Success', `Successfully imported ${result.created} transactions.`);
+                if (result.failed > 0) {
+                    addNotification('error', 'Some Rows Skipped', `${result.failed} rows could not be imported.`);
+                }
             } catch (err) {
                 console.error("Import failed:", err);
                 addNotification('error', 'Import Failed', err.message);